@@ -0,0 +1,193 @@
+import asyncio
+import atexit
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+import logging
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+from cachable.storage.file import FileStorage
+from cachable.storage.filestorage.image import CachableFileImage
+from corestring import string_hash
+from pixelme import Pixelate
+from corefile import TempPath
+from base64 import b64encode
+from uuid import uuid4
+import requests
+
+from app.config import app_config
+from app.core.diskcache import DiskCache
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ArtTooLarge(Exception):
+    pass
+
+
+class IconCache(object):
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__items: OrderedDict[str, tuple[str, Path]] = OrderedDict()
+        self.__lock = Lock()
+
+    def get(self, key: str) -> Optional[tuple[str, Path]]:
+        with self.__lock:
+            try:
+                self.__items.move_to_end(key)
+                self.hits += 1
+                return self.__items[key]
+            except KeyError:
+                self.misses += 1
+                return None
+
+    def put(self, key: str, value: tuple[str, Path]):
+        with self.__lock:
+            self.__items[key] = value
+            self.__items.move_to_end(key)
+            while len(self.__items) > self.maxsize:
+                self.__items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return dict(
+            size=len(self.__items),
+            maxsize=self.maxsize,
+            hits=self.hits,
+            misses=self.misses,
+        )
+
+
+ICONS = IconCache(app_config.art.icon_cache_size)
+ARTWORK = DiskCache(
+    root=Path(app_config.storage.storage),
+    max_bytes=app_config.art.cache_max_bytes,
+    max_age=app_config.art.cache_max_age,
+    index_name=app_config.art.cache_index,
+    pattern="*.png",
+)
+atexit.register(ARTWORK.save)
+WORKERS = ThreadPoolExecutor(
+    max_workers=app_config.art.workers, thread_name_prefix="art"
+)
+INFLIGHT: dict[str, Future] = {}
+INFLIGHT_LOCK = Lock()
+
+
+@contextmanager
+def download_image(url: str):
+    config = app_config.art
+    tmp_file = TempPath(f"{uuid4()}.jpg")
+    try:
+        with requests.get(url, stream=True, timeout=config.timeout) as response:
+            response.raise_for_status()
+            if int(response.headers.get("content-length", 0)) > config.max_bytes:
+                raise ArtTooLarge(url)
+            size = 0
+            with tmp_file.open("wb") as out_file:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > config.max_bytes:
+                        raise ArtTooLarge(url)
+                    out_file.write(chunk)
+        yield tmp_file
+    finally:
+        tmp_file.unlink(missing_ok=True)
+
+
+class NowPlayingImage(CachableFileImage):
+
+    failed = False
+
+    def __init__(self, url: str):
+        self._url = url
+        super().__init__()
+
+    def tocache(self, image_path: Path):
+        assert self._path
+        pix = Pixelate(image_path, padding=200, block_size=25, result_path=self._path)
+        pix.resize((8, 8))
+        self._path = pix.image_path
+
+    @property
+    def storage(self):
+        return FileStorage
+
+    @property
+    def base64(self):
+        base64_str = self.path.read_bytes()
+        base64_str = b64encode(base64_str)
+        return f"data:image/png;base64,{base64_str.decode()}"
+
+    @property
+    def filename(self):
+        return f"{string_hash(self.url)}.png"
+
+    @property
+    def url(self):
+        return self._url
+
+    def _init(self):
+        if self.isCached:
+            return
+        try:
+            with download_image(self.url) as image_path:
+                self.tocache(image_path)
+        except Exception as e:
+            logging.exception(e)
+            self.failed = True
+            self._path = self.DEFAULT
+
+
+def render(key: str, url: str) -> str:
+    image = NowPlayingImage(url)
+    res = image.base64
+    if not image.failed:
+        path = Path(image.path)
+        ICONS.put(key, (res, path))
+        ARTWORK.add(path)
+    return res
+
+
+def fetch(key: str, url: str) -> Future:
+    with INFLIGHT_LOCK:
+        future = INFLIGHT.get(key)
+        if future is None:
+            future = WORKERS.submit(render, key, url)
+            INFLIGHT[key] = future
+            future.add_done_callback(partial(release, key))
+        return future
+
+
+def release(key: str, future: Future):
+    with INFLIGHT_LOCK:
+        if INFLIGHT.get(key) is future:
+            del INFLIGHT[key]
+
+
+def icon(url: str) -> str:
+    key = string_hash(url)
+    hit = ICONS.get(key)
+    if hit is None:
+        return fetch(key, url).result()
+    res, path = hit
+    ARTWORK.touch(path)
+    return res
+
+
+async def icon_async(url: str) -> str:
+    key = string_hash(url)
+    hit = ICONS.get(key)
+    if hit is None:
+        return await asyncio.wrap_future(fetch(key, url))
+    res, path = hit
+    ARTWORK.touch(path)
+    return res
@@ -1,22 +1,114 @@
 from pathlib import Path
+from queue import Full
+from time import perf_counter
+from typing import Callable
 from fastapi import APIRouter, Depends, Request, Response
+from fastapi.routing import APIRoute
+from fastapi.exceptions import HTTPException, RequestValidationError
+from pydantic import TypeAdapter
+from starlette.status import (
+    HTTP_422_UNPROCESSABLE_ENTITY,
+    HTTP_429_TOO_MANY_REQUESTS,
+)
+import json
 import logging
 from app.api.auth import check_auth
-from app.api.models import AndroidNowPlaying
+from app.api.models import AndroidNowPlaying, BatchEvent
 from app.lametric import LaMetric
 from app.lametric.models import CONTENT_TYPE, MUSIC_STATUS
-from fastapi.responses import HTMLResponse
-from fastapi.concurrency import run_in_threadpool
-from lambo.hue.client import Hue
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from app.core.hue import ensure_hue
+from app.core.metrics import Metrics
+from app.core.tracing import Tracer
+
+
+class TimedRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        method = next(iter(self.methods), "")
+        traced = method in ("POST", "PUT")
+
+        async def timed_handler(request: Request) -> Response:
+            started = perf_counter()
+            if traced:
+                Tracer.begin(f"{method} {self.path}")
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = HTTP_422_UNPROCESSABLE_ENTITY
+                raise
+            finally:
+                labels = dict(route=self.path, method=method)
+                Metrics.histogram("api_request_seconds", **labels).observe(
+                    perf_counter() - started
+                )
+                Metrics.counter("api_requests_total", status=status, **labels).inc()
+
+        return timed_handler
+
+
+router = APIRouter(prefix="/api", route_class=TimedRoute)
+
+
+BatchEvents = TypeAdapter(list[BatchEvent])
+
+
+def queue_full(content_type: str):
+    logging.warning(f">>> QUEUE FULL {content_type}")
+    return HTTPException(
+        status_code=HTTP_429_TOO_MANY_REQUESTS,
+        detail="Queue is full",
+        headers={"Retry-After": f"{LaMetric.queue.retry_after}"},
+    )
+
+
+def traced(stage: str):
+    trace = Tracer.current()
+    if trace:
+        trace.mark(stage)
+        Tracer.record(trace)
+
+
+def enqueue(content_type: CONTENT_TYPE, payload):
+    traced("parsed")
+    try:
+        return LaMetric.queue.put_nowait((content_type, payload))
+    except Full:
+        raise queue_full(content_type)
 
 
-router = APIRouter(prefix="/api")
+@router.post("/events/batch")
+async def events_batch(request: Request, auth=Depends(check_auth)):
+    body = await request.body()
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            records = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            records = json.loads(body)
+        events = BatchEvents.validate_python(records)
+    except ValueError as e:
+        raise HTTPException(status_code=HTTP_422_UNPROCESSABLE_ENTITY, detail=f"{e}")
+    traces = [Tracer.fork(ev.type) for ev in events]
+    for trace in traces:
+        trace.mark("parsed")
+        Tracer.record(trace)
+    try:
+        LaMetric.queue.put_many([(ev.type, ev.payload) for ev in events], traces)
+    except Full as e:
+        raise queue_full(f"{e}")
+    return {"status": "ok", "count": len(events)}
 
 
 @router.post("/status")
 async def status(request: Request, auth=Depends(check_auth)):
     payload = await request.json()
-    return LaMetric.queue.put_nowait((CONTENT_TYPE.LIVESCOREEVENT, payload))
+    return enqueue(CONTENT_TYPE.LIVESCOREEVENT, payload)
 
 
 @router.put("/nowplaying")
@@ -25,12 +117,14 @@ async def nowplaying(request: Request):
         payload = await request.json()
         logging.debug(payload)
         android_frame = AndroidNowPlaying.from_request(payload)
-        frame = await run_in_threadpool(android_frame.get_frame)
-        return LaMetric.queue.put_nowait((CONTENT_TYPE.NOWPLAYING, frame.model_dump()))
+        frame = await android_frame.get_frame_async()
+        return enqueue(CONTENT_TYPE.NOWPLAYING, frame.model_dump())
+    except HTTPException:
+        raise
     except Exception as e:
         logging.exception(e)
-        return LaMetric.queue.put_nowait(
-            (CONTENT_TYPE.YANKOSTATUS, dict(status=MUSIC_STATUS.STOPPED.value))
+        return enqueue(
+            CONTENT_TYPE.YANKOSTATUS, dict(status=MUSIC_STATUS.STOPPED.value)
         )
 
 
@@ -38,20 +132,35 @@ async def nowplaying(request: Request):
 async def post_nowplaying(request: Request, auth=Depends(check_auth)):
     payload = await request.json()
     logging.debug(payload)
-    return LaMetric.queue.put_nowait((CONTENT_TYPE.NOWPLAYING, payload))
+    return enqueue(CONTENT_TYPE.NOWPLAYING, payload)
 
 
 @router.get("/playstatus")
 async def put_playstatus(status: str = "stopped"):
-    return LaMetric.queue.put_nowait(
-        (CONTENT_TYPE.YANKOSTATUS, dict(status=status))
-    )
+    return enqueue(CONTENT_TYPE.YANKOSTATUS, dict(status=status))
 
 
 @router.post("/subscription")
 async def on_subscription(request: Request, auth=Depends(check_auth)):
     payload = await request.json()
-    return LaMetric.queue.put_nowait((CONTENT_TYPE.LIVESCOREEVENT, payload))
+    return enqueue(CONTENT_TYPE.LIVESCOREEVENT, payload)
+
+
+@router.get("/queue")
+async def queue_stats(auth=Depends(check_auth)):
+    return LaMetric.queue.stats
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(auth=Depends(check_auth)):
+    return PlainTextResponse(
+        Metrics.exposition(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@router.get("/debug/traces")
+async def traces(limit: int = 50, auth=Depends(check_auth)):
+    return {"summary": Tracer.summary, "traces": Tracer.traces(limit)}
 
 
 @router.get("/privacy", response_class=HTMLResponse)
@@ -62,16 +171,17 @@ async def privacy():
 @router.post("/termo")
 async def post_termo(request: Request, auth=Depends(check_auth)):
     payload = await request.json()
-    LaMetric.queue.put_nowait((CONTENT_TYPE.TERMO, payload))
+    enqueue(CONTENT_TYPE.TERMO, payload)
     return {"status": "ok"}
 
 @router.post("/sure")
 async def post_sure(request: Request, auth=Depends(check_auth)):
     payload = await request.json()
-    LaMetric.queue.put_nowait((CONTENT_TYPE.SURE, payload))
+    enqueue(CONTENT_TYPE.SURE, payload)
     return {"status": "ok"}
 
 @router.post("/alert")
 async def post_alert(request: Request, auth=Depends(check_auth)):
-    Hue.signaling(duration=1000, colors=["DDDD00", "DD1FD0"])
+    with Metrics.track("hue_request", endpoint="signaling"):
+        ensure_hue().signaling(duration=1000, colors=["DDDD00", "DD1FD0"])
     return {"status": "ok"}
\ No newline at end of file
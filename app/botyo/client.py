@@ -1,12 +1,21 @@
 from app.config import app_config
 from enum import Enum
-from requests import get, post
+from requests import ConnectionError, ConnectTimeout, RequestException, Response, Session
+from requests.adapters import HTTPAdapter
 from app.botyo.models import (
     LivescoreEvent,
     SubscriptionEvent,
     Game
 )
 import logging
+from pydantic import BaseModel
+from random import uniform
+from time import perf_counter, sleep
+from typing import Optional
+from app.core.metrics import Metrics
+from urllib3.exceptions import NewConnectionError
+
+IDEMPOTENT = ("GET", "HEAD")
 
 
 class ENDPOINT(Enum):
@@ -17,6 +26,22 @@ class ENDPOINT(Enum):
     LEAGUE_SCHEDULE = 'league_schedule'
 
 
+def retryable(method: str, error: Optional[RequestException]) -> bool:
+    if method in IDEMPOTENT:
+        return True
+    if isinstance(error, ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error and error.args else None
+    return isinstance(error, ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+class LivescoreFeed(BaseModel):
+    content: bytes = b""
+    etag: Optional[str] = None
+    modified: Optional[str] = None
+    not_modified: bool = False
+
+
 class ClientMeta(type):
 
     _instance = None
@@ -35,6 +60,24 @@ class ClientMeta(type):
             logging.error(e)
         return []
 
+    def livescores_since(
+        cls, etag: Optional[str] = None, modified: Optional[str] = None
+    ) -> LivescoreFeed:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+        resp = cls().do_get_response(ENDPOINT.LIVESCORE.value, headers=headers)
+        if resp.status_code == 304:
+            return LivescoreFeed(etag=etag, modified=modified, not_modified=True)
+        resp.raise_for_status()
+        return LivescoreFeed(
+            content=resp.content,
+            etag=resp.headers.get("ETag"),
+            modified=resp.headers.get("Last-Modified"),
+        )
+
     def unsubscribe(cls, sub: SubscriptionEvent):
         json = {
             "webhook": f"http://{app_config.api.host}:{app_config.api.port}/api/subscription",
@@ -77,21 +120,66 @@ class ClientMeta(type):
 class Client(object, metaclass=ClientMeta):
 
     __host = None
+    __session: Session
 
     def __init__(self) -> None:
-        self.__host = app_config.botyo.host
+        config = app_config.botyo
+        self.__host = config.host
+        self.__config = config
+        self.__session = Session()
+        adapter = HTTPAdapter(
+            pool_connections=config.pool_size,
+            pool_maxsize=config.pool_size,
+            max_retries=0,
+        )
+        self.__session.mount("http://", adapter)
+        self.__session.mount("https://", adapter)
+
+    def timeout(self, name: str) -> tuple[float, float]:
+        config = self.__config
+        return (
+            config.connect_timeout,
+            config.timeouts.get(name, config.read_timeout),
+        )
+
+    def request(self, method: str, endpoint: str, **kwargs) -> Response:
+        name = endpoint.split("/")[0]
+        kwargs.setdefault("timeout", self.timeout(name))
+        latency = Metrics.histogram("botyo_request_seconds", endpoint=name)
+        errors = Metrics.counter("botyo_request_errors_total", endpoint=name)
+        attempt = 0
+        while True:
+            started = perf_counter()
+            try:
+                resp = self.__session.request(
+                    method=method, url=f"{self.__host}/{endpoint}", **kwargs
+                )
+                error = None
+            except RequestException as e:
+                resp = None
+                error = e
+            latency.observe(perf_counter() - started)
+            if resp is not None and resp.status_code < 500:
+                return resp
+            errors.inc()
+            if attempt >= self.__config.retries or not retryable(method, error):
+                if error:
+                    raise error
+                assert resp is not None
+                resp.raise_for_status()
+            delay = uniform(0, self.__config.backoff * pow(2, attempt))
+            reason = error if error else resp.status_code
+            logging.warning(f">>> BOTYO {name} retry in {delay:.2f}s {reason}")
+            attempt += 1
+            sleep(delay)
 
     def do_get(self, endpoint: str, **kwargs):
-        resp = get(
-            url=f"{self.__host}/{endpoint}",
-            **kwargs
-        )
+        resp = self.request("GET", endpoint, **kwargs)
         return resp.json()
 
+    def do_get_response(self, endpoint: str, **kwargs) -> Response:
+        return self.request("GET", endpoint, **kwargs)
+
     def do_post(self, endpoint: str, json, **kwargs):
-        resp = post(
-            url=f"{self.__host}/{endpoint}",
-            json=json,
-            **kwargs
-        )
+        resp = self.request("POST", endpoint, json=json, **kwargs)
         return resp.json()
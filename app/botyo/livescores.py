@@ -0,0 +1,102 @@
+from hashlib import md5
+import json
+import logging
+from threading import Event, RLock
+from typing import Optional
+
+from app.botyo.client import Client as BotyoClient
+from app.botyo.models import LivescoreEvent
+from app.core.thread import StoppableThread
+
+LIVE_INTERVAL = 20
+IDLE_INTERVAL = 300
+ERROR_INTERVAL = 60
+
+
+class LivescoreSnapshotMeta(type):
+
+    _instance: Optional["LivescoreSnapshot"] = None
+
+    def __call__(cls, *args, **kwds):
+        if not cls._instance:
+            cls._instance = type.__call__(cls, *args, **kwds)
+        return cls._instance
+
+    def start(cls) -> StoppableThread:
+        return cls().start_poller()
+
+    def stop(cls):
+        cls().stop_poller()
+
+    def get(cls, id: str) -> Optional[LivescoreEvent]:
+        return cls().events.get(id)
+
+    @property
+    def version(cls) -> int:
+        return cls().current_version
+
+
+class LivescoreSnapshot(object, metaclass=LivescoreSnapshotMeta):
+
+    __events: dict[str, LivescoreEvent]
+    __etag: Optional[str] = None
+    __modified: Optional[str] = None
+    __digest: Optional[str] = None
+    __thread: Optional[StoppableThread] = None
+
+    def __init__(self) -> None:
+        self.__events = {}
+        self.__lock = RLock()
+        self.__wakeup = Event()
+        self.current_version = 0
+
+    @property
+    def events(self) -> dict[str, LivescoreEvent]:
+        return self.__events
+
+    @property
+    def interval(self) -> int:
+        if any(x.inProgress for x in self.__events.values()):
+            return LIVE_INTERVAL
+        return IDLE_INTERVAL
+
+    def refresh(self) -> bool:
+        with self.__lock:
+            feed = BotyoClient.livescores_since(self.__etag, self.__modified)
+            if feed.not_modified:
+                return False
+            self.__etag = feed.etag
+            self.__modified = feed.modified
+            digest = md5(feed.content).hexdigest()
+            if digest == self.__digest:
+                return False
+            events = {}
+            for row in json.loads(feed.content) or []:
+                event = LivescoreEvent(**row)
+                events[event.id] = event
+            self.__events = events
+            self.__digest = digest
+            self.current_version += 1
+            return True
+
+    def poll(self):
+        while self.__thread and not self.__thread.stopped():
+            try:
+                self.refresh()
+                interval = self.interval
+            except Exception as e:
+                logging.error(f">>> LIVESCORES {e}")
+                interval = ERROR_INTERVAL
+            self.__wakeup.wait(interval)
+            self.__wakeup.clear()
+
+    def start_poller(self) -> StoppableThread:
+        if not self.__thread:
+            self.__thread = StoppableThread(target=self.poll)
+            self.__thread.start()
+        return self.__thread
+
+    def stop_poller(self):
+        if self.__thread:
+            self.__thread.stop()
+            self.__wakeup.set()
@@ -4,6 +4,7 @@ from app.lametric.models import (
     ContentFrame,
     ContentLight,
     ContentSound,
+    NOTIFICATION_PRIORITY,
     SOUNDS,
     ALERT_COLOR,
 )
@@ -196,6 +197,28 @@ class MatchEvent(BaseModel):
             pass
         return None
 
+    @property
+    def priority(self) -> NOTIFICATION_PRIORITY:
+        try:
+            match ACTION(self.action):
+                case ACTION.GOAL | ACTION.GOAL_DISALLOWED | ACTION.FULL_TIME:
+                    return NOTIFICATION_PRIORITY.CRITICAL
+                case ACTION.YELLOW_CARD | ACTION.RED_CARD | ACTION.SUBSTITUTION:
+                    return NOTIFICATION_PRIORITY.WARNING
+        except ValueError:
+            pass
+        return NOTIFICATION_PRIORITY.INFO
+
+    @property
+    def notification_key(self) -> Optional[str]:
+        try:
+            action = ACTION(self.action)
+            if action in [ACTION.GOAL, ACTION.GOAL_DISALLOWED]:
+                return f"{self.id}:score"
+        except ValueError:
+            pass
+        return None
+
     @property
     def winner(self) -> int:
         try:
@@ -26,6 +26,7 @@ class LametricApp(BaseModel):
     token: Optional[str] = None
     sleep_minutes: Optional[int] = None
     item_id: Optional[int] = None
+    weight: int = 1
 
 
 class YankoConfig(BaseModel):
@@ -35,6 +36,12 @@ class YankoConfig(BaseModel):
 
 class BotyoConfig(BaseModel):
     host: str
+    connect_timeout: float = 2
+    read_timeout: float = 10
+    timeouts: dict[str, float] = {"livescore": 5, "subscribe": 5, "unsubscribe": 5}
+    retries: int = 2
+    backoff: float = 0.5
+    pool_size: int = 4
 
 
 class ApiConfig(BaseModel):
@@ -52,6 +59,68 @@ class LametricConfig(BaseModel):
     apikey: str
     apps: dict[str, LametricApp]
     timezone: str
+    connect_timeout: float = 2
+    read_timeout: float = 5
+    pool_size: int = 4
+    frame_window: float = 0.25
+    notification_rate: float = 0.25
+    notification_burst: int = 3
+    activation_backoff: float = 1
+    activation_max_backoff: float = 60
+    reactivate_after: float = 300
+
+
+class IngressQueueConfig(BaseModel):
+    maxsize: int = 100
+    bounds: dict[str, int] = {"nowplaying": 10, "yanko_status": 10}
+    default_overflow: str = "drop_newest"
+    overflow: dict[str, str] = {
+        "nowplaying": "collapse",
+        "yanko_status": "collapse",
+        "termo": "collapse",
+        "sure": "collapse",
+    }
+    collapse_keys: dict[str, str] = {"termo": "location"}
+    collapse_fallback: str = "drop_oldest"
+    retry_after: int = 1
+
+
+class ArtConfig(BaseModel):
+    max_bytes: int = 5 * 1024 * 1024
+    timeout: float = 5
+    icon_cache_size: int = 256
+    workers: int = 2
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_max_age: int = 90 * 24 * 3600
+    cache_index: str = ".art-index.json"
+
+
+class StartupConfig(BaseModel):
+    workers: int = 8
+    deadline: float = 10
+    deadlines: dict[str, float] = {"apps": 5, "display": 5}
+
+
+class TracingConfig(BaseModel):
+    buffer: int = 1000
+
+
+class SimulatorFault(BaseModel):
+    latency: float = 0
+    jitter: float = 0
+    error_rate: float = 0
+    error_status: int = 503
+    drop_rate: float = 0
+    hang_rate: float = 0
+    hang: float = 30
+
+
+class SimulatorConfig(BaseModel):
+    host: str = "127.0.0.1"
+    port: int = 8080
+    fault: SimulatorFault = SimulatorFault()
+    endpoints: dict[str, SimulatorFault] = {}
+    record: int = 10000
 
 
 class _config(BaseModel):
@@ -63,6 +132,11 @@ class _config(BaseModel):
     api: ApiConfig
     display: list[str]
     saver: list[str]
+    queue: IngressQueueConfig = IngressQueueConfig()
+    startup: StartupConfig = StartupConfig()
+    art: ArtConfig = ArtConfig()
+    tracing: TracingConfig = TracingConfig()
+    simulator: SimulatorConfig = SimulatorConfig()
 
 
 settings = Path(environ.get("SETTINGS_PATH", "app/settings.yaml"))
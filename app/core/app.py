@@ -1,8 +1,11 @@
 from pathlib import Path
 from app.api.server import Server
+from app.botyo.livescores import LivescoreSnapshot
 from app.config import app_config
+from app.core.startup import Startup
 from app.core.thread import StoppableThread
 from app.lametric import LaMetric
+from app.lametric.widgets.items.subscriptions import Subscriptions
 from app.scheduler import Scheduler
 from cachable.storage.redis import RedisStorage
 from cachable.storage.file import FileStorage
@@ -19,13 +22,18 @@ class AppMeta(type):
         return self._instance
 
     def start(cls):
-        RedisStorage.register(app_config.storage.redis_url)
-        FileStorage.register(Path(app_config.storage.storage))
-        Scheduler.start()
+        with Startup.phase("core"):
+            RedisStorage.register(app_config.storage.redis_url)
+            FileStorage.register(Path(app_config.storage.storage))
+            Scheduler.start()
+            cls.threads.append(LivescoreSnapshot.start())
         cls().run()
 
     def terminate(cls):
         Scheduler.stop()
+        LivescoreSnapshot.stop()
+        LaMetric.stop()
+        Subscriptions.flush_all()
         for th in cls.threads:
             th.stop()
         cls().eventLoop.stop()
@@ -0,0 +1,140 @@
+import json
+import logging
+from pathlib import Path
+from threading import RLock
+from time import monotonic, time
+from typing import Optional
+
+SAVE_INTERVAL = 30
+
+
+class DiskCache(object):
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int,
+        max_age: float,
+        index_name: str = ".index.json",
+        pattern: str = "*",
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evicted = 0
+        self.__index_path = root / index_name
+        self.__pattern = pattern
+        self.__entries: Optional[dict[str, list]] = None
+        self.__size = 0
+        self.__dirty = False
+        self.__saved_at = monotonic()
+        self.__lock = RLock()
+
+    @property
+    def entries(self) -> dict[str, list]:
+        with self.__lock:
+            if self.__entries is None:
+                self.__entries = self.__load()
+                self.__size = sum(x[0] for x in self.__entries.values())
+                self.evict()
+            return self.__entries
+
+    def __load(self) -> dict[str, list]:
+        try:
+            data = json.loads(self.__index_path.read_text())
+            assert isinstance(data, dict)
+            return data
+        except FileNotFoundError:
+            pass
+        except (AssertionError, ValueError) as e:
+            logging.warning(f">>> DISKCACHE {self.__index_path} unreadable {e}")
+        self.__dirty = True
+        res = {}
+        for path in self.root.rglob(self.__pattern):
+            if path.is_file() and path != self.__index_path:
+                stat = path.stat()
+                res[f"{path.relative_to(self.root)}"] = [stat.st_size, stat.st_mtime]
+        logging.info(f">>> DISKCACHE indexed {len(res)} files in {self.root}")
+        return res
+
+    def __key(self, path: Path) -> Optional[str]:
+        try:
+            return f"{path.relative_to(self.root)}"
+        except ValueError:
+            return None
+
+    def add(self, path: Path):
+        key = self.__key(path)
+        if not key:
+            return
+        with self.__lock:
+            entries = self.entries
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                return
+            if key in entries:
+                self.__size -= entries[key][0]
+            entries[key] = [size, time()]
+            self.__size += size
+            self.__dirty = True
+            if self.__size > self.max_bytes or self.__save_due:
+                self.evict()
+
+    def touch(self, path: Path):
+        key = self.__key(path)
+        if not key:
+            return
+        with self.__lock:
+            entry = self.entries.get(key)
+            if entry:
+                entry[1] = time()
+                self.__dirty = True
+
+    def __remove(self, key: str):
+        size, _ = self.__entries.pop(key)
+        self.__size -= size
+        self.__dirty = True
+        self.evicted += 1
+        (self.root / key).unlink(missing_ok=True)
+
+    def evict(self):
+        with self.__lock:
+            entries = self.entries
+            expired = time() - self.max_age
+            for key in [k for k, v in entries.items() if v[1] < expired]:
+                self.__remove(key)
+            if self.__size > self.max_bytes:
+                for key in sorted(entries, key=lambda k: entries[k][1]):
+                    if self.__size <= self.max_bytes:
+                        break
+                    self.__remove(key)
+            self.save()
+
+    @property
+    def __save_due(self) -> bool:
+        return monotonic() - self.__saved_at > SAVE_INTERVAL
+
+    def save(self):
+        with self.__lock:
+            if not self.__dirty or self.__entries is None:
+                return
+            tmp = self.__index_path.with_suffix(".tmp")
+            try:
+                self.root.mkdir(parents=True, exist_ok=True)
+                tmp.write_text(json.dumps(self.__entries, separators=(",", ":")))
+                tmp.replace(self.__index_path)
+                self.__dirty = False
+                self.__saved_at = monotonic()
+            except OSError as e:
+                logging.error(f">>> DISKCACHE save {self.__index_path} {e}")
+
+    @property
+    def stats(self) -> dict[str, int]:
+        with self.__lock:
+            return dict(
+                files=len(self.entries),
+                bytes=self.__size,
+                max_bytes=self.max_bytes,
+                evicted=self.evicted,
+            )
@@ -0,0 +1,13 @@
+from functools import cache
+
+from app.config import app_config
+
+
+@cache
+def ensure_hue():
+    from lambo.hue.client import Hue
+
+    Hue.register(
+        hostname=app_config.lambo.hostname, username=app_config.lambo.username
+    )
+    return Hue
@@ -0,0 +1,168 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+
+Sample = tuple[str, str, dict, float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Counter(object):
+
+    def __init__(self) -> None:
+        self.value = 0
+        self.__lock = Lock()
+
+    def inc(self, amount: float = 1):
+        with self.__lock:
+            self.value += amount
+
+
+class Gauge(object):
+
+    def __init__(self) -> None:
+        self.value = 0
+        self.fn: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def collect(self) -> float:
+        return self.fn() if self.fn else self.value
+
+
+class Histogram(object):
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.__lock = Lock()
+
+    def observe(self, value: float):
+        idx = bisect_left(self.buckets, value)
+        with self.__lock:
+            self.counts[idx] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - started)
+
+
+class MetricsMeta(type):
+
+    _instance = None
+
+    def __call__(cls, *args, **kwds):
+        if not cls._instance:
+            cls._instance = type.__call__(cls, *args, **kwds)
+        return cls._instance
+
+    def counter(cls, name: str, **labels) -> Counter:
+        return cls().get(name, Counter, labels)
+
+    def histogram(cls, name: str, **labels) -> Histogram:
+        return cls().get(name, Histogram, labels)
+
+    def gauge(
+        cls, name: str, fn: Optional[Callable[[], float]] = None, **labels
+    ) -> Gauge:
+        res = cls().get(name, Gauge, labels)
+        if fn:
+            res.fn = fn
+        return res
+
+    @contextmanager
+    def track(cls, name: str, **labels):
+        started = perf_counter()
+        try:
+            yield
+        except Exception:
+            cls.counter(f"{name}_errors_total", **labels).inc()
+            raise
+        finally:
+            cls.histogram(f"{name}_seconds", **labels).observe(
+                perf_counter() - started
+            )
+
+    def collector(cls, name: str, fn: Callable[[], Iterable[Sample]]):
+        cls().add_collector(name, fn)
+
+    def exposition(cls) -> str:
+        return cls().render()
+
+
+class Metrics(object, metaclass=MetricsMeta):
+
+    def __init__(self) -> None:
+        self.__metrics: dict[tuple, object] = {}
+        self.__collectors: dict[str, Callable[[], Iterable[Sample]]] = {}
+        self.__lock = Lock()
+
+    def get(self, name: str, kind: type, labels: dict):
+        key = (name, tuple(sorted(labels.items())))
+        try:
+            return self.__metrics[key]
+        except KeyError:
+            with self.__lock:
+                return self.__metrics.setdefault(key, kind())
+
+    def add_collector(self, name: str, fn: Callable[[], Iterable[Sample]]):
+        with self.__lock:
+            self.__collectors[name] = fn
+
+    def samples(self) -> Iterable[Sample]:
+        for (name, labels), metric in list(self.__metrics.items()):
+            match metric:
+                case Counter():
+                    yield name, "counter", dict(labels), metric.value
+                case Gauge():
+                    yield name, "gauge", dict(labels), metric.collect()
+                case Histogram():
+                    seen = 0
+                    for le, count in zip(metric.buckets + ("+Inf",), metric.counts):
+                        seen += count
+                        yield name, "histogram", dict(labels, le=f"{le}"), seen
+                    yield f"{name}_sum", "histogram", dict(labels), metric.sum
+                    yield f"{name}_count", "histogram", dict(labels), metric.count
+        for collector in list(self.__collectors.values()):
+            yield from collector()
+
+    def render(self) -> str:
+        families: dict[str, list[str]] = {}
+        types: dict[str, str] = {}
+        for name, kind, labels, value in self.samples():
+            family = name
+            if kind == "histogram":
+                family = name.removesuffix("_sum").removesuffix("_count")
+                if "le" in labels:
+                    name = f"{name}_bucket"
+            types.setdefault(family, kind)
+            families.setdefault(family, []).append(
+                f"{name}{format_labels(labels)} {value}"
+            )
+        lines = []
+        for family, samples in families.items():
+            lines.append(f"# TYPE {family} {types[family]}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
+    return f"{{{pairs}}}"
+
+
+def escape(value) -> str:
+    return f"{value}".replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
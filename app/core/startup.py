@@ -0,0 +1,208 @@
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, wait
+from contextlib import contextmanager
+import logging
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Optional
+
+from app.config import app_config
+
+
+class StepTiming(object):
+
+    __slots__ = ("name", "started", "finished", "failed", "late")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = monotonic()
+        self.finished: Optional[float] = None
+        self.failed = False
+        self.late = False
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class PhaseTiming(object):
+
+    __slots__ = ("name", "started", "finished", "steps")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = monotonic()
+        self.finished: Optional[float] = None
+        self.steps: dict[str, StepTiming] = {}
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class StartupMeta(type):
+
+    _instance = None
+
+    def __call__(cls, *args, **kwds):
+        if not cls._instance:
+            cls._instance = type.__call__(cls, *args, **kwds)
+        return cls._instance
+
+    def phase(cls, name: str):
+        return cls().timed(name)
+
+    def run(cls, phase: str, steps: dict[str, Callable[[], Any]]):
+        return cls().run_steps(phase, steps)
+
+    def submit(cls, phase: str, name: str, fn: Callable[[], Any]) -> Future:
+        return cls().submit_step(phase, name, fn)
+
+    def mark(cls, name: str):
+        return cls().add_mark(name)
+
+    def result(cls, phase: str, name: str, future: Future, default: Any = None):
+        return cls().step_result(phase, name, future, default)
+
+    @property
+    def report(cls) -> dict[str, Any]:
+        return cls().summary
+
+
+class Startup(object, metaclass=StartupMeta):
+
+    def __init__(self) -> None:
+        self.__config = app_config.startup
+        self.__started = monotonic()
+        self.__phases: dict[str, PhaseTiming] = {}
+        self.__marks: dict[str, float] = {}
+        self.__lock = Lock()
+        self.__pool = ThreadPoolExecutor(
+            max_workers=self.__config.workers, thread_name_prefix="startup"
+        )
+
+    def deadline(self, step: str) -> float:
+        return self.__config.deadlines.get(step, self.__config.deadline)
+
+    @contextmanager
+    def timed(self, name: str):
+        timing = self.__phases.setdefault(name, PhaseTiming(name))
+        try:
+            yield timing
+        finally:
+            timing.finished = monotonic()
+            logging.info(f">>> STARTUP {name} {timing.duration:.2f}s")
+
+    def __step(self, timing: StepTiming, fn: Callable[[], Any]):
+        try:
+            return fn()
+        except Exception:
+            timing.failed = True
+            raise
+        finally:
+            timing.finished = monotonic()
+            if timing.late:
+                logging.warning(
+                    f">>> STARTUP {timing.name} finished late {timing.duration:.2f}s"
+                )
+
+    def __background(self, phase: PhaseTiming, timing: StepTiming, fn):
+        try:
+            return self.__step(timing, fn)
+        except Exception as e:
+            logging.error(f">>> STARTUP {phase.name}/{timing.name} failed {e}")
+            raise
+        finally:
+            with self.__lock:
+                if all(x.finished for x in phase.steps.values()):
+                    phase.finished = monotonic()
+
+    def submit_step(self, phase: str, name: str, fn: Callable[[], Any]) -> Future:
+        with self.__lock:
+            timing = self.__phases.setdefault(phase, PhaseTiming(phase))
+            timing.finished = None
+            step = timing.steps[name] = StepTiming(name)
+        return self.__pool.submit(self.__background, timing, step, fn)
+
+    def run_steps(
+        self, phase: str, steps: dict[str, Callable[[], Any]]
+    ) -> dict[str, Future]:
+        with self.timed(phase) as timing:
+            futures: dict[str, Future] = {}
+            for name, fn in steps.items():
+                step = timing.steps.setdefault(name, StepTiming(name))
+                futures[name] = self.__pool.submit(self.__step, step, fn)
+            for name, future in futures.items():
+                remaining = timing.started + self.deadline(name) - monotonic()
+                wait([future], timeout=max(0, remaining))
+                if not future.done():
+                    timing.steps[name].late = True
+                    logging.warning(
+                        f">>> STARTUP {phase}/{name} missed its {self.deadline(name)}s deadline"
+                    )
+                elif future.exception():
+                    logging.error(
+                        f">>> STARTUP {phase}/{name} failed {future.exception()}"
+                    )
+            return futures
+
+    def step_result(self, phase: str, name: str, future: Future, default: Any):
+        timing = self.__phases.get(phase)
+        started = timing.started if timing else monotonic()
+        remaining = started + self.deadline(name) - monotonic()
+        try:
+            return future.result(timeout=max(0, remaining))
+        except TimeoutError:
+            logging.warning(f">>> STARTUP {phase}/{name} degraded, deadline expired")
+        except Exception as e:
+            logging.warning(f">>> STARTUP {phase}/{name} degraded, {e}")
+        return default
+
+    def add_mark(self, name: str):
+        with self.__lock:
+            if name in self.__marks:
+                return
+            self.__marks[name] = monotonic() - self.__started
+        logging.info(f">>> STARTUP {name} after {self.__marks[name]:.2f}s")
+        for line in self.lines:
+            logging.info(line)
+
+    @property
+    def lines(self) -> list[str]:
+        res = []
+        for phase in self.__phases.values():
+            duration = phase.duration
+            res.append(
+                f">>> {phase.name:<12} {duration or 0:.2f}s"
+                + ("" if duration is not None else " (running)")
+            )
+            for step in phase.steps.values():
+                state = "failed" if step.failed else "late" if step.late else ""
+                res.append(
+                    f">>>   {step.name:<10} {step.duration or 0:.2f}s {state}".rstrip()
+                )
+        return res
+
+    @property
+    def summary(self) -> dict[str, Any]:
+        return dict(
+            marks={k: round(v, 3) for k, v in self.__marks.items()},
+            phases={
+                phase.name: dict(
+                    started=round(phase.started - self.__started, 3),
+                    duration=phase.duration,
+                    steps={
+                        step.name: dict(
+                            duration=step.duration,
+                            failed=step.failed,
+                            late=step.late,
+                        )
+                        for step in phase.steps.values()
+                    },
+                )
+                for phase in self.__phases.values()
+            },
+        )
@@ -0,0 +1,136 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from math import ceil
+from threading import Lock
+from time import perf_counter, time
+from typing import Any, Optional
+from uuid import uuid4
+
+from app.config import app_config
+
+
+class Trace(object):
+
+    __slots__ = ("id", "kind", "started_at", "t0", "stages")
+
+    def __init__(self, kind: str) -> None:
+        self.id = uuid4().hex[:16]
+        self.kind = kind
+        self.started_at = time()
+        self.t0 = perf_counter()
+        self.stages: list[tuple[str, float]] = []
+
+    def mark(self, stage: str):
+        self.stages.append((stage, perf_counter() - self.t0))
+
+    @property
+    def durations(self) -> list[tuple[str, float]]:
+        res = []
+        previous = 0.0
+        for stage, offset in list(self.stages):
+            res.append((stage, offset - previous))
+            previous = offset
+        return res
+
+    def as_dict(self) -> dict[str, Any]:
+        return dict(
+            id=self.id,
+            kind=self.kind,
+            started_at=self.started_at,
+            stages=[
+                dict(stage=stage, at_ms=round(offset * 1000, 3), ms=round(d * 1000, 3))
+                for (stage, offset), (_, d) in zip(list(self.stages), self.durations)
+            ],
+        )
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0
+    return values[max(0, ceil(q * len(values)) - 1)]
+
+
+class TracerMeta(type):
+
+    _instance = None
+    _current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+    def __call__(cls, *args, **kwds):
+        if not cls._instance:
+            cls._instance = type.__call__(cls, *args, **kwds)
+        return cls._instance
+
+    def begin(cls, kind: str) -> Trace:
+        trace = Trace(kind)
+        cls._current.set(trace)
+        return trace
+
+    def fork(cls, kind: str) -> Trace:
+        parent = cls._current.get()
+        if not parent:
+            return Trace(kind)
+        trace = Trace(f"{parent.kind} {kind}")
+        trace.started_at, trace.t0 = parent.started_at, parent.t0
+        return trace
+
+    def current(cls) -> Optional[Trace]:
+        return cls._current.get()
+
+    def mark(cls, stage: str):
+        trace = cls._current.get()
+        if trace:
+            trace.mark(stage)
+
+    @contextmanager
+    def use(cls, trace: Optional[Trace]):
+        token = cls._current.set(trace)
+        try:
+            yield trace
+        finally:
+            cls._current.reset(token)
+
+    def record(cls, trace: Trace):
+        cls().add(trace)
+
+    def traces(cls, limit: int = 50) -> list[dict]:
+        return [x.as_dict() for x in cls().latest(limit)]
+
+    @property
+    def summary(cls) -> dict[str, dict]:
+        return cls().stage_summary()
+
+
+class Tracer(object, metaclass=TracerMeta):
+
+    def __init__(self) -> None:
+        self.__buffer: deque[Trace] = deque(maxlen=app_config.tracing.buffer)
+        self.__lock = Lock()
+
+    def add(self, trace: Trace):
+        with self.__lock:
+            self.__buffer.append(trace)
+
+    def latest(self, limit: int) -> list[Trace]:
+        with self.__lock:
+            return list(self.__buffer)[-limit:][::-1]
+
+    def stage_summary(self) -> dict[str, dict]:
+        with self.__lock:
+            traces = list(self.__buffer)
+        stages: dict[str, list[float]] = {}
+        for trace in traces:
+            for stage, duration in trace.durations:
+                stages.setdefault(stage, []).append(duration)
+            if trace.stages:
+                stages.setdefault("total", []).append(trace.stages[-1][1])
+        res = {}
+        for stage, values in stages.items():
+            values.sort()
+            res[stage] = dict(
+                count=len(values),
+                p50_ms=round(percentile(values, 0.5) * 1000, 3),
+                p95_ms=round(percentile(values, 0.95) * 1000, 3),
+                p99_ms=round(percentile(values, 0.99) * 1000, 3),
+            )
+        return res
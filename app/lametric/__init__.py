@@ -1,30 +1,39 @@
 import logging
-from queue import Empty, Queue
+from queue import Empty
+from threading import current_thread
 
 from app.lametric.client import Client
 from app.config import app_config
+from app.core.metrics import Metrics
+from app.core.startup import Startup
+from app.core.tracing import Tracer
 from app.lametric.models import (
     CONTENT_TYPE,
     DEVICE_MODE,
 )
 from app.lametric.display import Display
+from app.lametric.queue import EventQueue
 import time
 
 
 class LaMetricMeta(type):
 
     _instance = None
-    _queue: Queue
+    _queue: EventQueue
 
     def __call__(self, *args, **kwds):
         if not self._instance:
-            self._queue = Queue()
+            self._queue = EventQueue(app_config.queue)
             self._instance = type.__call__(self, *args, **kwds)
         return self._instance
 
     def start(cls, mainQueue):
         cls().run(mainQueue)
 
+    def stop(cls):
+        if cls._instance:
+            cls._instance.flush()
+
     @property
     def queue(cls):
         return cls._queue
@@ -35,31 +44,63 @@ class LaMetric(object, metaclass=LaMetricMeta):
     _client: Client
     _display: Display
     _mainQueue = None
+    _thread = None
 
     def __init__(self) -> None:
-        self._client = Client(app_config.lametric)
+        self._client = Client(app_config.lametric, on_pending=self.wake)
         self._display = Display(client=self._client)
         self._client.set_device_mode(DEVICE_MODE.MANUAL)
 
     def run(self, mainQueue):
         self._mainQueue = mainQueue
+        self._thread = current_thread()
         queue = LaMetric.queue
         logging.info(">>>> LAMETRUIC QUEUE START")
+        Startup.mark("loop")
+        first_frame = False
         while True:
             try:
-                cmd, payload = queue.get_nowait()
-                match(cmd):
-                    case CONTENT_TYPE.NOWPLAYING:
-                        self._display.on_response(cmd, payload)
-                    case CONTENT_TYPE.YANKOSTATUS:
-                        self._display.on_response(cmd, payload)
-                    case CONTENT_TYPE.LIVESCOREEVENT:
-                        self._display.on_response(cmd, payload)
-                    case CONTENT_TYPE.TERMO:
-                        self._display.on_response(cmd, payload)
-                    case CONTENT_TYPE.SURE:
-                        self._display.on_response(cmd, payload)
-                queue.task_done()
+                items = queue.get_entries(timeout=self.next_update_in)
+                started = time.monotonic()
+                for entry in items:
+                    cmd, payload = entry.cmd, entry.payload
+                    with Tracer.use(entry.trace):
+                        match(cmd):
+                            case CONTENT_TYPE.NOWPLAYING:
+                                self._display.on_response(cmd, payload)
+                            case CONTENT_TYPE.YANKOSTATUS:
+                                self._display.on_response(cmd, payload)
+                            case CONTENT_TYPE.LIVESCOREEVENT:
+                                self._display.on_response(cmd, payload)
+                            case CONTENT_TYPE.TERMO:
+                                self._display.on_response(cmd, payload)
+                            case CONTENT_TYPE.SURE:
+                                self._display.on_response(cmd, payload)
+                        Tracer.mark("handled")
+                logging.debug(
+                    f">>> {len(items)} events queued {queue.last_wait * 1000:.1f}ms, "
+                    f"handled {(time.monotonic() - started) * 1000:.1f}ms"
+                )
             except Empty:
-                time.sleep(0.2)
-            self._display.update()
+                pass
+            with Metrics.histogram("display_update_seconds").time():
+                self._display.update()
+            self._client.flush()
+            if not first_frame and any(w.sent for w in self._client.writers):
+                first_frame = True
+                Startup.mark("first_frame")
+
+    def flush(self):
+        self._client.flush(force=True)
+
+    def wake(self):
+        if current_thread() is not self._thread:
+            LaMetric.queue.wake()
+
+    @property
+    def next_update_in(self) -> float:
+        timeout = self._display.next_update_in
+        flush_in = self._client.next_flush_in
+        if flush_in is not None:
+            timeout = min(timeout, flush_in)
+        return timeout
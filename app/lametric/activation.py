@@ -0,0 +1,60 @@
+import logging
+from time import time
+from typing import Optional
+
+from app.config import LametricConfig
+from app.lametric.widgets.base import BaseWidget
+
+
+class Activation(object):
+
+    active: Optional[str] = None
+    activated_at: float = 0
+    retry_at: Optional[float] = None
+
+    def __init__(self, config: LametricConfig) -> None:
+        self.__config = config
+        self.failures = 0
+        self.sent = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def key(self, widget: BaseWidget) -> str:
+        return f"{widget.widget.package}/{widget.widget_id}"
+
+    def ensure(self, widget: BaseWidget) -> bool:
+        key = self.key(widget)
+        now = time()
+        if key == self.active and now - self.activated_at < self.__config.reactivate_after:
+            self.skipped += 1
+            self.retry_at = None
+            return True
+        status = widget.activate()
+        if status and 200 <= status < 300:
+            self.active = key
+            self.activated_at = now
+            self.failures = 0
+            self.retry_at = None
+            self.sent += 1
+            return True
+        self.active = None
+        self.failures += 1
+        self.failed += 1
+        delay = min(
+            self.__config.activation_max_backoff,
+            self.__config.activation_backoff * pow(2, self.failures - 1),
+        )
+        self.retry_at = now + delay
+        logging.warning(f">>> ACTIVATE {key} failed {status}, retry in {delay:.1f}s")
+        return False
+
+    def invalidate(self):
+        self.active = None
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return dict(
+            sent=self.sent,
+            skipped=self.skipped,
+            failed=self.failed,
+        )
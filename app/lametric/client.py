@@ -1,49 +1,93 @@
 from datetime import datetime, timezone
+from functools import partial
 import logging
+from time import monotonic
+from typing import Callable, Optional
 
-from numpy import mat
 from app.core import clean_frame
+from app.core.metrics import Metrics
 from app.config import LametricConfig, LametricApp
 import requests
-from requests import ConnectionError
+from requests import ConnectionError, Timeout
+from requests.adapters import HTTPAdapter
+from requests.auth import _basic_auth_str
 from cachable.request import Method
 from app.lametric.models import (
     APPNAME,
     DEVICE_MODE,
     App,
+    NOTIFICATION_PRIORITY,
     DeviceDisplay,
     Notification,
     Content,
 )
+from app.lametric.notifications import NotificationScheduler
+from app.lametric.writer import FrameWriter
 
 
 class Client(object):
 
     __config: LametricConfig
+    __session: requests.Session
+    __headers: dict[str, str]
+    __widget_headers: dict[str, dict[str, str]]
 
-    def __init__(self, config: LametricConfig) -> None:
+    def __init__(
+        self,
+        config: LametricConfig,
+        on_pending: Optional[Callable[[], None]] = None,
+    ) -> None:
         self.__config = config
+        self.__on_pending = on_pending
+        self.__session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=config.pool_size,
+            pool_maxsize=config.pool_size,
+            max_retries=0,
+        )
+        self.__session.mount("http://", adapter)
+        self.__session.mount("https://", adapter)
+        self.__headers = {
+            "Authorization": _basic_auth_str(config.user, config.apikey),
+            "Accept": "application/json",
+        }
+        self.__widget_headers = {}
+        self.__writers: dict[str, FrameWriter] = {}
+        self.__notifications = NotificationScheduler(
+            send=self.send_notification,
+            rate=config.notification_rate,
+            burst=config.notification_burst,
+            on_pending=on_pending,
+        )
+        Metrics.collector("lametric_client", self.samples)
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return (self.__config.connect_timeout, self.__config.read_timeout)
+
+    def request(self, method: Method, url: str, **args) -> requests.Response:
+        args.setdefault("timeout", self.timeout)
+        return self.__session.request(method=method.value, url=url, **args)
 
     def api_call(self, method: Method, endpoint: str, **args):
         host = self.__config.host
-        user = self.__config.user
-        apikey = self.__config.apikey
         try:
-            response = requests.request(
-                method=method.value,
-                auth=(user, apikey),
-                url=f"{host}/api/v2/{endpoint}",
-                **args,
-            )
+            with Metrics.track("lametric_request", endpoint=endpoint):
+                response = self.request(
+                    method,
+                    url=f"{host}/api/v2/{endpoint}",
+                    headers=self.__headers,
+                    **args,
+                )
+            if response.status_code >= 400:
+                Metrics.counter("lametric_request_errors_total", endpoint=endpoint).inc()
             match method:
-                case Method.POST:
-                    response.close()
                 case Method.GET:
                     return response.json()
                 case _:
-                    response.close()
-        except Exception:
-            pass
+                    return response.status_code
+        except Exception as e:
+            logging.warning(f">>> LAMETRIC {method.value} {endpoint} {e}")
 
     def set_device_mode(self, mode: DEVICE_MODE):
         return self.api_call(Method.PUT, "device", json=dict(mode=mode.value))
@@ -52,23 +96,33 @@ class Client(object):
         app = self.__config.apps.get(config_name.value)
         assert isinstance(app, LametricApp)
         url = app.endpoint
-        token = app.token
-        assert token
         try:
-            response = requests.request(
-                method=method.value,
-                headers={
-                    "X-Access-Token": token,
-                    "Cache-Control": "no-cache",
-                    "Accept": "application/json",
-                },
-                url=f"{url}",
-                **args,
-            )
+            with Metrics.track("lametric_request", endpoint=f"widget/{config_name}"):
+                response = self.request(
+                    method,
+                    headers=self.widget_headers(config_name, app),
+                    url=f"{url}",
+                    **args,
+                )
+            if response.status_code >= 400:
+                Metrics.counter(
+                    "lametric_request_errors_total", endpoint=f"widget/{config_name}"
+                ).inc()
             return response.status_code
-        except ConnectionError as e:
+        except (ConnectionError, Timeout) as e:
             logging.exception(e)
 
+    def widget_headers(self, config_name: APPNAME, app: LametricApp):
+        if config_name.value not in self.__widget_headers:
+            token = app.token
+            assert token
+            self.__widget_headers[config_name.value] = {
+                "X-Access-Token": token,
+                "Cache-Control": "no-cache",
+                "Accept": "application/json",
+            }
+        return self.__widget_headers[config_name.value]
+
     def send_notification(self, notification: Notification):
         data = notification.model_dump()
         data["model"]["frames"] = list(
@@ -77,6 +131,18 @@ class Client(object):
         data["model"] = clean_frame(data.get("model", {}))
         return self.api_call(Method.POST, "device/notifications", json=data)
 
+    def notify(
+        self,
+        notification: Notification,
+        key: Optional[str] = None,
+        priority: Optional[NOTIFICATION_PRIORITY] = None,
+    ):
+        self.__notifications.push(notification, key=key, priority=priority)
+
+    @property
+    def notifications(self) -> NotificationScheduler:
+        return self.__notifications
+
     def get_apps(self) -> dict[str, App]:
         res = self.api_call(Method.GET, "device/apps")
         assert res
@@ -87,19 +153,76 @@ class Client(object):
         assert isinstance(res, dict)
         return DeviceDisplay(updated_at=datetime.now(tz=timezone.utc), **res)
 
-    def send_model(self, config_name: APPNAME, model: Content):
-        data = model.model_dump()
+    def model_data(self, model: Content) -> dict:
+        data = model.model_dump(mode="json")
         data = clean_frame(data)
         data["frames"] = list(map(clean_frame, data.get("frames", [])))
+        return data
+
+    def send_model(self, config_name: APPNAME, model: Content):
+        return self.send_data(config_name, self.model_data(model))
+
+    def send_data(self, config_name: APPNAME, data: dict):
         return self.widget_call(config_name, Method.POST, json=data)
 
     def send_model_api2(self, config_name: APPNAME, model: Content):
+        return self.send_data_api2(config_name, self.model_data(model))
+
+    def send_data_api2(self, config_name: APPNAME, data: dict):
         app = self.__config.apps.get(config_name.value)
         assert isinstance(app, LametricApp)
         package = app.package
         widget_id = app.widget_id
         endpoint = f"widget/update/{package}/{widget_id}"
-        data = model.model_dump(mode="json")
-        data = clean_frame(data)
-        data["frames"] = list(map(clean_frame, data.get("frames", [])))
         return self.api_call(Method.POST, endpoint=endpoint, json=data)
+
+    def writer(self, config_name: APPNAME, api2: bool = False) -> FrameWriter:
+        if config_name.value not in self.__writers:
+            send = self.send_data_api2 if api2 else self.send_data
+            self.__writers[config_name.value] = FrameWriter(
+                appname=config_name,
+                serialize=self.model_data,
+                send=partial(send, config_name),
+                window=self.__config.frame_window,
+                on_pending=self.__on_pending,
+            )
+        return self.__writers[config_name.value]
+
+    @property
+    def writers(self) -> list[FrameWriter]:
+        return list(self.__writers.values())
+
+    def flush(self, force: bool = False):
+        for writer in self.writers:
+            writer.flush(force=force)
+        self.__notifications.flush()
+
+    def samples(self):
+        for writer in self.writers:
+            for outcome, count in writer.stats.items():
+                yield (
+                    "lametric_frame_writes_total",
+                    "counter",
+                    dict(app=writer.appname.value, outcome=outcome),
+                    count,
+                )
+        stats = self.__notifications.stats
+        yield "lametric_notifications_pending", "gauge", {}, stats["pending"]
+        for outcome in ("queued", "superseded", "sent"):
+            yield (
+                "lametric_notifications_total",
+                "counter",
+                dict(outcome=outcome),
+                stats[outcome],
+            )
+
+    @property
+    def next_flush_in(self) -> Optional[float]:
+        n = monotonic()
+        due = [w.due_at - n for w in self.writers if w.due_at is not None]
+        notifications_in = self.__notifications.next_flush_in
+        if notifications_in is not None:
+            due.append(notifications_in)
+        if not due:
+            return None
+        return max(0, min(due))
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+import logging
+from threading import Event
+from time import time
+from typing import Callable, Optional
+
+from app.core.thread import StoppableThread
+from app.lametric.client import Client
+from app.lametric.models import (
+    DeviceDisplay,
+    DisplayScreensave,
+    ModeTimeBased,
+    ScreensaveModes,
+)
+
+REFRESH_INTERVAL = 300
+ERROR_INTERVAL = 60
+
+
+def fallback_display() -> DeviceDisplay:
+    mode = ModeTimeBased(
+        enabled=False,
+        end_time="00:00:00",
+        start_time="00:00:00",
+        local_end_time="00:00:00",
+        local_start_time="00:00:00",
+    )
+    return DeviceDisplay(
+        brightness=100,
+        screensaver=DisplayScreensave(
+            enabled=False, modes=ScreensaveModes(time_based=mode)
+        ),
+        updated_at=datetime.now(tz=timezone.utc),
+    )
+
+
+class DeviceState(object):
+
+    __thread: Optional[StoppableThread] = None
+
+    def __init__(
+        self,
+        client: Client,
+        display: Optional[DeviceDisplay],
+        on_recover: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.__client = client
+        self.__on_recover = on_recover
+        self.__wakeup = Event()
+        self.__degraded = display is None
+        self.__set(display or fallback_display())
+
+    def __set(self, display: DeviceDisplay):
+        on_at, off_at = display.screensaver.window(datetime.now(tz=timezone.utc))
+        self.__state = (display, on_at, off_at)
+
+    @property
+    def display(self) -> DeviceDisplay:
+        return self.__state[0]
+
+    def is_saver_active(self, now: Optional[float] = None) -> bool:
+        now = now or time()
+        display, on_at, off_at = self.__state
+        if now >= off_at:
+            self.__set(display)
+            display, on_at, off_at = self.__state
+        return on_at <= now
+
+    def refresh(self):
+        self.__set(self.__client.get_display())
+
+    def poll(self):
+        interval = ERROR_INTERVAL if self.__degraded else REFRESH_INTERVAL
+        while self.__thread and not self.__thread.stopped():
+            self.__wakeup.wait(interval)
+            self.__wakeup.clear()
+            try:
+                self.refresh()
+                if interval == ERROR_INTERVAL and self.__on_recover:
+                    self.__on_recover()
+                interval = REFRESH_INTERVAL
+            except Exception as e:
+                logging.error(f">>> DEVICE DISPLAY {e}")
+                interval = ERROR_INTERVAL
+
+    def start(self) -> StoppableThread:
+        if not self.__thread:
+            self.__thread = StoppableThread(target=self.poll)
+            self.__thread.start()
+        return self.__thread
+
+    def stop(self):
+        if self.__thread:
+            self.__thread.stop()
+            self.__wakeup.set()
@@ -3,46 +3,43 @@ from queue import Queue
 import sys
 from xml.etree.ElementTree import QName
 
-import rich
-from app.lametric.widgets.base import BaseWidget
+from app.lametric.widgets.base import BaseWidget, SubscriptionWidget
+from app.lametric.routing import LivescoreRouter
+from app.lametric.activation import Activation
+from app.lametric.device import DeviceState
 from app.config import LametricApp
 from app.lametric.client import Client
-from app.lametric.models import CONTENT_TYPE, App, APPNAME, DeviceDisplay, Widget
+from app.lametric.models import CONTENT_TYPE, App, APPNAME, Widget
 from app.config import app_config
+from app.core.metrics import Metrics
+from app.core.startup import Startup
+from app.core.tracing import Tracer
+from functools import partial
 from time import time
-from app.lametric.widgets import (
-    RMWidget,
-    YankoWidget,
-    ClockWidget,
-    LivescoresWidget,
-    WorldCupWidget,
-    WeatherWidget,
-    DatetickerWidget,
-    SydneyWidget,
-)
-from typing import List, Optional
+from app.lametric.widgets import widget_class
+from concurrent.futures import Future
+from typing import Callable, List, Optional
 from typing import Any
-from pydantic import BaseModel, Extra, Field, validator
+from pydantic import BaseModel, Extra, Field
 import json
 
-from app.lametric.widgets.sure import SureWidget
-from app.lametric.widgets.termo import TermoWidget
+
+MIN_SLOT = 5
 
 
 class DisplayItem(BaseModel, arbitrary_types_allowed=True):
     app: LametricApp
-    widget: BaseWidget
+    loader: Callable[[APPNAME], BaseWidget]
     duration: int
     appname: APPNAME
     hidden: bool = Field(default=False)
     activated_at: Optional[float] = None
 
-    @validator("widget")
-    def widget_val(cls, v):
-        return v
+    @property
+    def widget(self) -> BaseWidget:
+        return self.loader(self.appname)
 
     def activate(self):
-        self.widget.activate()
         self.activated_at = time()
         self.widget.onShow()
 
@@ -54,89 +51,144 @@ class DisplayItem(BaseModel, arbitrary_types_allowed=True):
         except AssertionError:
             pass
 
+    @property
+    def slot(self) -> float:
+        return max(MIN_SLOT, self.widget.duration(self.duration) or 0)
+
     @property
     def isExpired(self):
         try:
             assert self.activated_at
-            duration = self.widget.duration(self.duration)
-            return (time() - self.activated_at) > duration
+            return (time() - self.activated_at) > self.slot
         except AssertionError:
             return False
 
+    @property
+    def expires_at(self) -> Optional[float]:
+        try:
+            assert self.activated_at
+            return self.activated_at + self.slot
+        except AssertionError:
+            return None
+
+    @property
+    def weight(self) -> int:
+        return max(1, self.app.weight)
+
     @property
     def isActive(self):
         return self.activated_at is not None
 
     @property
     def isAllowed(self):
-        return not (self.hidden or self.widget.isHidden)
+        if self.hidden:
+            return False
+        widget = self.widget
+        return widget.ready and not widget.isHidden
+
 
+class DisplayScheduler(object):
 
-class RepeatingItems(list):
+    def __init__(self, items: list[DisplayItem]) -> None:
+        self.items = items
+        self.skipped = 0
+        self.shown: dict[str, int] = {}
+        self.__credit: dict[str, int] = {x.appname.value: 0 for x in items}
 
-    def drop(self) -> DisplayItem:
-        res = super().pop(0)
-        self.append(res)
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __allowed(self, item: DisplayItem) -> bool:
+        try:
+            return item.isAllowed
+        except AssertionError:
+            return False
+
+    def next(self) -> Optional[DisplayItem]:
+        eligible = list(filter(self.__allowed, self.items))
+        self.skipped += len(self.items) - len(eligible)
+        if not eligible:
+            return None
+        for item in eligible:
+            self.__credit[item.appname.value] += item.weight
+        res = max(eligible, key=lambda x: self.__credit[x.appname.value])
+        self.__credit[res.appname.value] -= sum(x.weight for x in eligible)
+        self.shown[res.appname.value] = self.shown.get(res.appname.value, 0) + 1
         return res
 
 
+MAX_IDLE = 60
+WARMUP_POLL = 1
+
 class Display(object):
     _apps: dict[str, App] = {}
     _client: Client
     _current: DisplayItem = None
     _widgets: dict[str, BaseWidget] = {}
-    _device_display: DeviceDisplay
+    _device: DeviceState
 
     def __init__(self, client: Client):
         self._client = client
-        self._apps = client.get_apps()
         BaseWidget.register(self._client)
-        self._device_display = self._client.get_display()
-        self._items: RepeatingItems[DisplayItem] = RepeatingItems([])
-        self._saveritems: RepeatingItems[DisplayItem] = RepeatingItems([])
-        self.__init()
+        device = Startup.run(
+            "device", dict(apps=client.get_apps, display=client.get_display)
+        )
+        self._apps = Startup.result("device", "apps", device["apps"], {})
+        self.__apps_loaded = False
+        self._activation = Activation(app_config.lametric)
+        self._device = DeviceState(
+            client,
+            Startup.result("device", "display", device["display"]),
+            on_recover=self._activation.invalidate,
+        )
+        self._device.start()
+        self._saver = False
+        self._livescores = LivescoreRouter()
+        self.__warming: dict[str, Future] = {}
+        items = self.__init()
+        self._items = DisplayScheduler(items)
+        self._saveritems = DisplayScheduler(items)
+        Metrics.collector("display", self.samples)
+        self.__subscribe()
+        if not self._apps:
+            device["apps"].add_done_callback(self.__on_apps)
+
+    def __subscribe(self):
+        for item in self._items.items:
+            try:
+                if issubclass(widget_class(item.appname), SubscriptionWidget):
+                    self.getWidget(item.appname)
+            except AssertionError:
+                pass
+
+    def __on_apps(self, future: Future):
+        if future.exception():
+            return
+        self._apps = future.result()
+        self.__apps_loaded = True
+        logging.info(f">>> DEVICE apps loaded late {len(self._apps)}")
+
+    def __late_subscribe(self):
+        if self.__apps_loaded:
+            self.__apps_loaded = False
+            self.__subscribe()
 
     @property
     def is_screensaver_active(self):
-        if self._device_display.needs_update:
-            self._device_display = self._client.get_display()
-        if not self._device_display.screensaver.enabled:
-            return False
-        if not self._device_display.screensaver.modes.time_based.enabled:
-            return False
-        return self._device_display.screensaver.modes.time_based.isActive
+        return self._device.is_saver_active()
 
-    def __init(self):
+    def __init(self) -> list[DisplayItem]:
         lametricaps = app_config.lametric.apps
-
+        res = []
         for name in app_config.display:
             try:
                 app = lametricaps.get(name)
                 assert isinstance(app, LametricApp)
                 assert isinstance(app.duration, int)
-                self._items.append(
+                res.append(
                     DisplayItem(
                         app=app,
-                        widget=self.getWidget(
-                            APPNAME(name), app.package, **app.model_dump()
-                        ),
-                        duration=app.duration,
-                        hidden=False,
-                        appname=APPNAME(name),
-                    )
-                )
-            except AssertionError as e:
-                pass
-
-        for name in app_config.display:
-            try:
-                app = lametricaps.get(name)
-                assert isinstance(app, LametricApp)
-                assert isinstance(app.duration, int)
-                self._saveritems.append(
-                    DisplayItem(
-                        app=app,
-                        widget=self.getWidget(APPNAME(name), app.package),
+                        loader=self.getWidget,
                         duration=app.duration,
                         hidden=False,
                         appname=APPNAME(name),
@@ -144,8 +196,11 @@ class Display(object):
                 )
             except AssertionError as e:
                 pass
+        return res
 
     def on_response(self, content_type: CONTENT_TYPE, payload):
+        Tracer.mark("on_response")
+        self.__late_subscribe()
         payload_struct = json.loads(payload) if isinstance(payload, str) else payload
         match (content_type):
             case CONTENT_TYPE.NOWPLAYING:
@@ -165,114 +220,97 @@ class Display(object):
                     name=APPNAME.YANKO, method="yankostatus", payload=payload_struct
                 )
             case CONTENT_TYPE.LIVESCOREEVENT:
-                payload_struct = self.invoke_widget(
-                    name=APPNAME.RM, method="on_event", payload=payload_struct
-                )
-                # payload = self.invoke_widget(
-                #     name=APPNAME.LA_LIGA, method="on_event", payload=payload
-                # )
-                # payload = self.invoke_widget(
-                #     name=APPNAME.PREMIER_LEAGUE,
-                # method="on_event",
-                # payload=payload
-                # )
-                payload = self.invoke_widget(
-                    name=APPNAME.WORLDCUP, method="on_event", payload=payload
-                )
-                self.invoke_widget(
-                    name=APPNAME.LIVESCORES, method="on_event", payload=payload_struct
-                )
+                self._livescores.route(payload_struct)
 
     def invoke_widget(self, name: APPNAME, method: str, payload: Any):
         try:
-            wdg = self._widgets.get(name.value)
-            assert isinstance(wdg, BaseWidget)
+            wdg = self.getWidget(name)
             assert hasattr(wdg, method)
             assert callable(getattr(wdg, method))
             return getattr(wdg, method)(payload)
         except AssertionError:
             return payload
 
-    def getNext(self):
-        return (
-            self._saveritems.drop()
-            if self.is_screensaver_active
-            else self._items.drop()
-        )
+    def getNext(self) -> Optional[DisplayItem]:
+        saver = self.is_screensaver_active
+        if saver != self._saver:
+            self._saver = saver
+            self._activation.invalidate()
+        return self._saveritems.next() if saver else self._items.next()
+
+    @property
+    def next_update_in(self) -> float:
+        deadline = time() + (WARMUP_POLL if self.__warming else MAX_IDLE)
+        try:
+            assert self._current
+            assert self._current.isAllowed
+            expires_at = self._current.expires_at
+            assert expires_at
+            deadline = min(deadline, expires_at)
+            retry_at = self._activation.retry_at
+            assert retry_at
+            deadline = min(deadline, retry_at)
+        except AssertionError:
+            pass
+        return max(0, deadline - time())
 
     def update(self):
+        self.__late_subscribe()
+        if self.__warming:
+            self.__warming = {
+                k: v for k, v in self.__warming.items() if not v.done()
+            }
         try:
             assert self._current
+            assert self._current.isActive
             assert self._current.isAllowed
-            if self._current.isExpired:
-                self._current.deactivate()
-                raise AssertionError
-            if not self._current.isActive:
-                self._current.activate()
+            assert not self._current.isExpired
+            retry_at = self._activation.retry_at
+            if retry_at and retry_at <= time():
+                self._activation.ensure(self._current.widget)
+            return
         except AssertionError:
-            self._current = self.getNext()
-
-    def getWidget(self, name: APPNAME, package_name: str, **kwargs) -> BaseWidget:
-        if name not in self._widgets:
-            app = self._apps.get(package_name)
-            widget_id = kwargs.get("widget_id", "")
-            assert widget_id
-            del kwargs["widget_id"]
+            pass
+        if self._current:
+            self._current.deactivate()
+        self._current = self.getNext()
+        if self._current:
+            self._activation.ensure(self._current.widget)
+            self._current.activate()
+
+    def samples(self):
+        for mode, scheduler in (("rotation", self._items), ("saver", self._saveritems)):
+            yield "display_skipped_total", "counter", dict(mode=mode), scheduler.skipped
+            for app, shown in scheduler.shown.items():
+                yield "display_shown_total", "counter", dict(mode=mode, app=app), shown
+        for outcome, count in self._activation.stats.items():
+            yield "display_activations_total", "counter", dict(outcome=outcome), count
+
+    def __warm_up(self, widget: BaseWidget):
+        try:
+            widget.warm_up()
+        finally:
+            widget.ready = True
+
+    def getWidget(self, name: APPNAME) -> BaseWidget:
+        if name.value not in self._widgets:
+            assert name.value in app_config.display
+            config = app_config.lametric.apps.get(name.value)
+            assert isinstance(config, LametricApp)
+            app = self._apps.get(config.package)
             assert isinstance(app, App)
-            app_widgets = app.widgets
-            assert isinstance(app_widgets, dict)
-            assert isinstance(widget_id, str)
-            widget_data = app_widgets[widget_id]
+            assert isinstance(app.widgets, dict)
+            widget_data = app.widgets.get(config.widget_id)
             assert isinstance(widget_data, Widget)
-            match (name):
-                case APPNAME.CLOCK:
-                    self._widgets[name.value] = ClockWidget(
-                        widget_id=widget_id, widget=widget_data, **kwargs
-                    )
-                case APPNAME.SYDNEY:
-                    self._widgets[name.value] = SydneyWidget(
-                        widget_id=widget_id, widget=widget_data, **kwargs
-                    )
-                case APPNAME.TERMO:
-                    self._widgets[name.value] = TermoWidget(
-                        widget_id=widget_id, widget=widget_data, **kwargs
-                    )
-                case APPNAME.SURE:
-                    self._widgets[name.value] = SureWidget(
-                        widget_id=widget_id, widget=widget_data, **kwargs
-                    )
-                case APPNAME.WEATHER:
-                    self._widgets[name.value] = WeatherWidget(
-                        widget_id=widget_id, widget=widget_data, **kwargs
-                    )
-                case APPNAME.DATETICKER:
-                    self._widgets[name.value] = DatetickerWidget(
-                        widget_id=widget_id, widget=widget_data, **kwargs
-                    )
-                case APPNAME.YANKO:
-                    self._widgets[name.value] = YankoWidget(
-                        widget_id=widget_id, widget=widget_data, **kwargs
-                    )
-                case APPNAME.RM:
-                    self._widgets[name.value] = RMWidget(
-                        widget_id=widget_id, widget=widget_data, **kwargs
-                    )
-                case APPNAME.LIVESCORES:
-                    self._widgets[name.value] = LivescoresWidget(
-                        widget_id=widget_id, widget=widget_data, **kwargs
-                    )
-                case APPNAME.WORLDCUP:
-                    self._widgets[name.value] = WorldCupWidget(
-                        widget_id=widget_id, widget=widget_data, **kwargs
-                    )
-                # case APPNAME.LA_LIGA:
-                #     self._widgets[name.value] = LaLigaWidget(
-                #         widget_id=widget_id, widget=widget_data, **kwargs
-                #     )
-                # case APPNAME.PREMIER_LEAGUE:
-                #     self._widgets[name.value] = PremierLeagueWidget(
-                #         widget_id=widget_id, widget=widget_data, **kwargs
-                #     )
-        res = self._widgets.get(name.value)
-        assert isinstance(res, BaseWidget)
-        return res
+            widget = widget_class(name)(
+                widget_id=config.widget_id,
+                widget=widget_data,
+                **config.model_dump(exclude={"widget_id"}),
+            )
+            self._widgets[name.value] = widget
+            if isinstance(widget, SubscriptionWidget):
+                self._livescores.register(widget)
+            self.__warming[name.value] = Startup.submit(
+                "warmup", name.value, partial(self.__warm_up, widget)
+            )
+        return self._widgets[name.value]
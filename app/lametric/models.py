@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
-from datetime import time, datetime, timezone, timedelta
+from datetime import time, datetime, timedelta
+from functools import cached_property
+from math import inf
 from typing import Optional
 from enum import Enum, IntEnum, StrEnum
 from app.core.time import LOCAL_TIMEZONE
@@ -107,6 +109,12 @@ class ALERT_DURATION(IntEnum):
     FULL_TIME=3000
     DEFAULT=1000
 
+class NOTIFICATION_PRIORITY(IntEnum):
+    CRITICAL = 0
+    WARNING = 1
+    INFO = 2
+
+
 class ModeTimeBased(BaseModel):
     enabled: bool
     end_time: str
@@ -114,21 +122,33 @@ class ModeTimeBased(BaseModel):
     local_end_time: str
     local_start_time: str
 
+    @cached_property
+    def times(self) -> tuple[time, time]:
+        return (
+            time.fromisoformat(self.local_start_time),
+            time.fromisoformat(self.local_end_time),
+        )
+
+    def window(self, now: datetime) -> tuple[float, float]:
+        if not self.enabled:
+            return (inf, inf)
+        start_time, end_time = self.times
+        today = now.astimezone(LOCAL_TIMEZONE).date()
+        for days in (-1, 0, 1):
+            day = today + timedelta(days=days)
+            start = datetime.combine(day, start_time, tzinfo=LOCAL_TIMEZONE)
+            end = datetime.combine(day, end_time, tzinfo=LOCAL_TIMEZONE)
+            if end <= start:
+                end += timedelta(days=1)
+            if end > now:
+                return (start.timestamp(), end.timestamp())
+        return (inf, inf)
+
     @property
     def isActive(self):
-        if not self.enabled:
-            return False
-        n = datetime.now(tz=LOCAL_TIMEZONE).time()
-        return all(
-            [
-                time.fromisoformat(self.local_start_time).replace(
-                    tzinfo=LOCAL_TIMEZONE)
-                < n,
-                time.fromisoformat(self.local_end_time).replace(
-                    tzinfo=LOCAL_TIMEZONE)
-                > n,
-            ]
-        )
+        n = datetime.now(tz=LOCAL_TIMEZONE)
+        start, end = self.window(n)
+        return start <= n.timestamp() < end
 
 
 class ScreensaveModes(BaseModel):
@@ -139,17 +159,17 @@ class DisplayScreensave(BaseModel):
     enabled: bool
     modes: ScreensaveModes
 
+    def window(self, now: datetime) -> tuple[float, float]:
+        if not self.enabled:
+            return (inf, inf)
+        return self.modes.time_based.window(now)
+
 
 class DeviceDisplay(BaseModel):
     brightness: int
     screensaver: DisplayScreensave
     updated_at: datetime
 
-    @property
-    def needs_update(self) -> bool:
-        td = timedelta(minutes=5)
-        return (datetime.now(tz=timezone.utc) - self.updated_at) > td
-
 
 class Widget(BaseModel):
     index: int
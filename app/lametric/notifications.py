@@ -0,0 +1,141 @@
+import heapq
+import logging
+from itertools import count
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Optional
+
+from app.core.tracing import Tracer
+from app.lametric.models import NOTIFICATION_PRIORITY, Notification
+
+
+class TokenBucket(object):
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = monotonic()
+
+    def __refill(self):
+        n = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (n - self.updated_at) * self.rate)
+        self.updated_at = n
+
+    def take(self) -> bool:
+        self.__refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    @property
+    def next_token_in(self) -> float:
+        self.__refill()
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class QueuedNotification(object):
+
+    def __init__(
+        self,
+        priority: NOTIFICATION_PRIORITY,
+        seq: int,
+        notification: Notification,
+        key: Optional[str],
+    ) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.notification = notification
+        self.key = key
+        self.superseded = False
+        self.trace = Tracer.current()
+
+    def __lt__(self, other: "QueuedNotification"):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class NotificationScheduler(object):
+
+    __heap: list[QueuedNotification]
+    __keys: dict[str, QueuedNotification]
+
+    def __init__(
+        self,
+        send: Callable[[Notification], Any],
+        rate: float,
+        burst: int,
+        on_pending: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.__send = send
+        self.__on_pending = on_pending
+        self.__bucket = TokenBucket(rate=rate, capacity=burst)
+        self.__heap = []
+        self.__keys = {}
+        self.__seq = count()
+        self.__lock = Lock()
+        self.queued = 0
+        self.superseded = 0
+        self.sent = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return dict(
+            queued=self.queued,
+            superseded=self.superseded,
+            sent=self.sent,
+            pending=len([x for x in self.__heap if not x.superseded]),
+        )
+
+    def push(
+        self,
+        notification: Notification,
+        key: Optional[str] = None,
+        priority: Optional[NOTIFICATION_PRIORITY] = None,
+    ):
+        if priority is None:
+            try:
+                priority = NOTIFICATION_PRIORITY[notification.priority.upper()]
+            except KeyError:
+                priority = NOTIFICATION_PRIORITY.INFO
+        with self.__lock:
+            self.queued += 1
+            item = QueuedNotification(priority, next(self.__seq), notification, key)
+            if key:
+                previous = self.__keys.get(key)
+                if previous:
+                    previous.superseded = True
+                    self.superseded += 1
+                self.__keys[key] = item
+            heapq.heappush(self.__heap, item)
+        if self.__on_pending:
+            self.__on_pending()
+
+    def __drop_superseded(self):
+        while self.__heap and self.__heap[0].superseded:
+            heapq.heappop(self.__heap)
+
+    def flush(self):
+        while True:
+            with self.__lock:
+                self.__drop_superseded()
+                if not self.__heap or not self.__bucket.take():
+                    return
+                item = heapq.heappop(self.__heap)
+                if item.key:
+                    del self.__keys[item.key]
+            logging.debug(f">>> NOTIFICATION {item.priority.name} {item.key}")
+            self.__send(item.notification)
+            if item.trace:
+                item.trace.mark("send_notification")
+            self.sent += 1
+
+    @property
+    def next_flush_in(self) -> Optional[float]:
+        with self.__lock:
+            self.__drop_superseded()
+            if not self.__heap:
+                return None
+            return self.__bucket.next_token_in
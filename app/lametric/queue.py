@@ -0,0 +1,238 @@
+from collections import deque
+from enum import StrEnum
+from itertools import count
+from queue import Empty, Full
+from threading import Condition
+from time import monotonic
+from typing import Any, Optional
+
+from app.config import IngressQueueConfig
+from app.core.metrics import Metrics
+from app.core.tracing import Trace, Tracer
+
+
+class OVERFLOW_POLICY(StrEnum):
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    COLLAPSE = "collapse"
+
+
+class QueueEntry(object):
+
+    __slots__ = ("seq", "updated", "queued_at", "cmd", "payload", "key", "trace")
+
+    def __init__(self, seq: int, cmd: str, payload: Any, key: Optional[str]):
+        self.seq = seq
+        self.updated = seq
+        self.queued_at = monotonic()
+        self.cmd = cmd
+        self.payload = payload
+        self.key = key
+        self.trace = Tracer.current()
+        if self.trace:
+            self.trace.mark("enqueued")
+
+
+class TypeStats(object):
+
+    __slots__ = (
+        "accepted",
+        "rejected",
+        "dropped",
+        "collapsed",
+        "taken",
+        "waited",
+        "max_wait",
+    )
+
+    def __init__(self):
+        self.accepted = 0
+        self.taken = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.collapsed = 0
+        self.waited = 0.0
+        self.max_wait = 0.0
+
+
+class EventQueue(object):
+
+    last_wait: float = 0
+    __woken = False
+
+    def __init__(self, config: IngressQueueConfig) -> None:
+        self.__config = config
+        self.__queues: dict[str, deque[QueueEntry]] = {}
+        self.__stats: dict[str, TypeStats] = {}
+        self.__seq = count()
+        self.__size = 0
+        self.__not_empty = Condition()
+        Metrics.collector("lametric_queue", self.samples)
+
+    @property
+    def retry_after(self) -> int:
+        return self.__config.retry_after
+
+    def bound(self, cmd: str) -> int:
+        return self.__config.bounds.get(cmd, self.__config.maxsize)
+
+    def policy(self, cmd: str) -> OVERFLOW_POLICY:
+        return OVERFLOW_POLICY(
+            self.__config.overflow.get(cmd, self.__config.default_overflow)
+        )
+
+    def collapse_key(self, cmd: str, payload: Any) -> Optional[str]:
+        field = self.__config.collapse_keys.get(cmd)
+        if field and isinstance(payload, dict):
+            return f"{payload.get(field)}"
+        return None
+
+    def collapse_fallback(self) -> OVERFLOW_POLICY:
+        res = OVERFLOW_POLICY(self.__config.collapse_fallback)
+        assert res != OVERFLOW_POLICY.COLLAPSE
+        return res
+
+    def __collapse(self, queue: deque[QueueEntry], key: Optional[str], payload: Any):
+        if key is None:
+            return False
+        entry = next(filter(lambda x: x.key == key, reversed(queue)), None)
+        if not entry:
+            return False
+        if entry.trace:
+            entry.trace.mark("collapsed")
+        entry.payload = payload
+        entry.updated = next(self.__seq)
+        entry.trace = Tracer.current()
+        if entry.trace:
+            entry.trace.mark("enqueued")
+        return True
+
+    def __evict(self, queue: deque[QueueEntry], stats: TypeStats):
+        entry = min(queue, key=lambda x: x.updated)
+        queue.remove(entry)
+        self.__size -= 1
+        stats.dropped += 1
+
+    def __offer(self, cmd: str, payload: Any):
+        """COLLAPSE replaces the newest pending entry with the same collapse key;
+        keyless payloads never collapse. On a miss the collapse_fallback policy
+        applies: drop_oldest evicts the least recently written entry, so an
+        entry that was just collapsed is kept, and drop_newest rejects."""
+        queue = self.__queues.setdefault(cmd, deque())
+        stats = self.__stats.setdefault(cmd, TypeStats())
+        key = self.collapse_key(cmd, payload)
+        policy = self.policy(cmd)
+        if policy == OVERFLOW_POLICY.COLLAPSE:
+            if len(queue) >= self.bound(cmd) and self.__collapse(queue, key, payload):
+                stats.collapsed += 1
+                return
+            policy = self.collapse_fallback()
+        if len(queue) >= self.bound(cmd):
+            match policy:
+                case OVERFLOW_POLICY.DROP_NEWEST:
+                    stats.rejected += 1
+                    raise Full(cmd)
+                case OVERFLOW_POLICY.DROP_OLDEST:
+                    self.__evict(queue, stats)
+        queue.append(QueueEntry(next(self.__seq), cmd, payload, key))
+        self.__size += 1
+        stats.accepted += 1
+
+    def put_nowait(self, item: tuple[str, Any]):
+        cmd, payload = item
+        with self.__not_empty:
+            self.__offer(cmd, payload)
+            self.__not_empty.notify()
+
+    def put_many(
+        self, items: list[tuple[str, Any]], traces: Optional[list[Trace]] = None
+    ):
+        with self.__not_empty:
+            incoming: dict[str, int] = {}
+            for cmd, _ in items:
+                incoming[cmd] = incoming.get(cmd, 0) + 1
+            for cmd, size in incoming.items():
+                if self.policy(cmd) != OVERFLOW_POLICY.DROP_NEWEST:
+                    continue
+                if len(self.__queues.get(cmd, ())) + size > self.bound(cmd):
+                    self.__stats.setdefault(cmd, TypeStats()).rejected += size
+                    raise Full(cmd)
+            for idx, (cmd, payload) in enumerate(items):
+                with Tracer.use(traces[idx] if traces else Tracer.current()):
+                    self.__offer(cmd, payload)
+            self.__not_empty.notify()
+
+    def __pop(self) -> QueueEntry:
+        queue = min(
+            filter(len, self.__queues.values()), key=lambda x: x[0].seq
+        )
+        entry = queue.popleft()
+        self.__size -= 1
+        wait = monotonic() - entry.queued_at
+        stats = self.__stats[entry.cmd]
+        stats.taken += 1
+        stats.waited += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        self.last_wait = wait
+        Metrics.histogram("lametric_queue_wait_seconds", type=entry.cmd).observe(wait)
+        if entry.trace:
+            entry.trace.mark("dequeued")
+        return entry
+
+    def get(self, block=True, timeout: Optional[float] = None) -> tuple[str, Any]:
+        with self.__not_empty:
+            if not block:
+                timeout = 0
+            if not self.__not_empty.wait_for(lambda: self.__size > 0, timeout):
+                raise Empty
+            entry = self.__pop()
+            return entry.cmd, entry.payload
+
+    def get_nowait(self) -> tuple[str, Any]:
+        return self.get(block=False)
+
+    def get_entries(self, timeout: Optional[float] = None) -> list[QueueEntry]:
+        with self.__not_empty:
+            if not self.__not_empty.wait_for(
+                lambda: self.__size > 0 or self.__woken, timeout
+            ):
+                raise Empty
+            self.__woken = False
+            return [self.__pop() for _ in range(self.__size)]
+
+    def wake(self):
+        with self.__not_empty:
+            self.__woken = True
+            self.__not_empty.notify()
+
+    def qsize(self) -> int:
+        return self.__size
+
+    @property
+    def stats(self) -> dict[str, dict]:
+        with self.__not_empty:
+            res = {}
+            for cmd, stats in self.__stats.items():
+                taken = stats.taken
+                res[cmd] = dict(
+                    depth=len(self.__queues[cmd]),
+                    bound=self.bound(cmd),
+                    accepted=stats.accepted,
+                    rejected=stats.rejected,
+                    dropped=stats.dropped,
+                    collapsed=stats.collapsed,
+                    avg_wait_ms=round(stats.waited / taken * 1000, 3) if taken else 0,
+                    max_wait_ms=round(stats.max_wait * 1000, 3),
+                )
+            return res
+
+    def samples(self):
+        for cmd, stats in self.stats.items():
+            yield "lametric_queue_depth", "gauge", dict(type=cmd), stats["depth"]
+            for outcome in ("accepted", "rejected", "dropped", "collapsed"):
+                yield (
+                    "lametric_queue_events_total",
+                    "counter",
+                    dict(type=cmd, outcome=outcome),
+                    stats[outcome],
+                )
@@ -0,0 +1,45 @@
+from typing import Any, Optional
+
+from app.lametric.widgets.base import ROUTE, SubscriptionWidget
+
+
+class LivescoreRouter(object):
+
+    __teams: dict[int, SubscriptionWidget]
+    __leagues: dict[int, SubscriptionWidget]
+    __default: Optional[SubscriptionWidget] = None
+
+    def __init__(self) -> None:
+        self.__teams = {}
+        self.__leagues = {}
+
+    def register(self, widget: SubscriptionWidget):
+        match widget.route:
+            case (ROUTE.TEAM, team_id):
+                self.__teams[team_id] = widget
+            case (ROUTE.LEAGUE, league_id):
+                self.__leagues[league_id] = widget
+            case None:
+                self.__default = widget
+
+    def resolve(self, record: dict) -> Optional[SubscriptionWidget]:
+        for key in ("home_team_id", "away_team_id"):
+            if widget := self.__teams.get(record.get(key)):
+                return widget
+        if widget := self.__leagues.get(record.get("league_id")):
+            return widget
+        return self.__default
+
+    def route(self, payload: Any):
+        if not payload:
+            return
+        if not isinstance(payload, list):
+            if widget := self.resolve(payload):
+                widget.on_routed(payload)
+            return
+        parts: dict[SubscriptionWidget, list[dict]] = {}
+        for record in payload:
+            if widget := self.resolve(record):
+                parts.setdefault(widget, []).append(record)
+        for widget, records in parts.items():
+            widget.on_routed(records)
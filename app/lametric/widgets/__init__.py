@@ -1,14 +1,55 @@
-from .clock import ClockWidget, SydneyWidget
-from .weather import WeatherWidget
-from .yanko import YankoWidget
-from .rm import RMWidget
-from .dateticker import DatetickerWidget
-from .livescore import (
-    LivescoresWidget,
-    WorldCupWidget,
-    LaLigaWidget,
-    PremierLeagueWidget,
-)
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+from app.lametric.models import APPNAME
+
+if TYPE_CHECKING:
+    from .base import BaseWidget
+
+WIDGETS: dict[str, str] = {
+    "ClockWidget": ".clock",
+    "SydneyWidget": ".clock",
+    "WeatherWidget": ".weather",
+    "YankoWidget": ".yanko",
+    "RMWidget": ".rm",
+    "DatetickerWidget": ".dateticker",
+    "LivescoresWidget": ".livescore",
+    "WorldCupWidget": ".livescore",
+    "LaLigaWidget": ".livescore",
+    "PremierLeagueWidget": ".livescore",
+    "TermoWidget": ".termo",
+    "SureWidget": ".sure",
+}
+
+REGISTRY: dict[APPNAME, str] = {
+    APPNAME.CLOCK: "ClockWidget",
+    APPNAME.SYDNEY: "SydneyWidget",
+    APPNAME.TERMO: "TermoWidget",
+    APPNAME.SURE: "SureWidget",
+    APPNAME.WEATHER: "WeatherWidget",
+    APPNAME.DATETICKER: "DatetickerWidget",
+    APPNAME.YANKO: "YankoWidget",
+    APPNAME.RM: "RMWidget",
+    APPNAME.LIVESCORES: "LivescoresWidget",
+    APPNAME.WORLDCUP: "WorldCupWidget",
+    # APPNAME.LA_LIGA: "LaLigaWidget",
+    # APPNAME.PREMIER_LEAGUE: "PremierLeagueWidget",
+}
+
+
+def widget_class(name: APPNAME) -> type["BaseWidget"]:
+    class_name = REGISTRY.get(name)
+    assert class_name
+    return __getattr__(class_name)
+
+
+def __getattr__(name: str):
+    try:
+        module = WIDGETS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
+
 
 __all__ = [
     "ClockWidget",
@@ -20,5 +61,8 @@ __all__ = [
     "LaLigaWidget",
     "PremierLeagueWidget",
     "DatetickerWidget",
-    "SydneyWidget"
+    "SydneyWidget",
+    "TermoWidget",
+    "SureWidget",
+    "widget_class",
 ]
@@ -1,9 +1,11 @@
 import logging
+from app.core.tracing import Tracer
 from app.lametric.client import Client
 from app.lametric.models import (
     Widget,
 )
-from typing import Any
+from enum import StrEnum
+from typing import Any, Optional
 from cachable.request import Method
 from app.botyo.models import (
     MatchEvent,
@@ -13,6 +15,11 @@ from app.botyo.models import (
 )
 
 
+class ROUTE(StrEnum):
+    TEAM = "team"
+    LEAGUE = "league"
+
+
 class WidgetMeta(type):
 
     _instances: dict[str, 'BaseWidget'] = {}
@@ -42,6 +49,7 @@ class BaseWidget(object, metaclass=WidgetMeta):
     widget_id: str
     widget: Widget
     options: dict[str, Any]
+    ready: bool = False
 
     def __init__(self, widget_id: str, widget: Widget, **kwargs):
         self.widget_id = widget_id
@@ -69,6 +77,9 @@ class BaseWidget(object, metaclass=WidgetMeta):
         except AssertionError:
             return 0
 
+    def warm_up(self):
+        pass
+
     def onShow(self):
         raise NotImplementedError
 
@@ -89,17 +100,18 @@ class BaseWidget(object, metaclass=WidgetMeta):
 
 class SubscriptionWidget(BaseWidget):
 
-    def on_event(self, payload):
+    @property
+    def route(self) -> Optional[tuple[ROUTE, int]]:
+        return None
+
+    def on_routed(self, widget_payload):
         try:
-            logging.debug(f"on_event {self.__class__.__name__} {payload}")
-            assert payload
-            widget_payload = self.filter_payload(payload)
-            assert widget_payload
             if isinstance(widget_payload, list):
                 self.on_match_events(
                     [MatchEvent(**x) for x in widget_payload]
                 )
-                return list(filter(lambda p: p not in widget_payload, payload))
+                Tracer.mark("on_match_events")
+                return
             action = ACTION(widget_payload.get("action"))
             match(action):
                 case ACTION.CANCEL_JOB:
@@ -111,18 +123,10 @@ class SubscriptionWidget(BaseWidget):
                 case ACTION.UNSUBSUBSCRIBED:
                     self.on_unsubscribed_event(
                         SubscriptionEvent(**widget_payload))
-            payload = None
-        except AssertionError as e:
-            pass
         except ValueError as e:
             logging.exception(e)
         except Exception as e:
             logging.exception(e)
-        finally:
-            return payload
-
-    def filter_payload(self, payload):
-        return payload
 
     def on_match_events(self, events: list[MatchEvent]):
         raise NotImplementedError
@@ -0,0 +1,71 @@
+import json
+import pickle
+from app.botyo.models import SubscriptionEvent
+
+
+CODEC_VERSION = 1
+PICKLE_MARK = 0x80
+
+SCHEMAS: dict[int, tuple[str, ...]] = {
+    1: (
+        "id",
+        "action",
+        "league",
+        "league_id",
+        "home_team",
+        "home_team_id",
+        "away_team",
+        "away_team_id",
+        "event_id",
+        "event_name",
+        "job_id",
+        "icon",
+        "start_time",
+        "status",
+        "score",
+        "home_team_icon",
+        "away_team_icon",
+        "display_event_name",
+    ),
+}
+
+
+class CodecError(Exception):
+    pass
+
+
+class UnknownVersion(CodecError):
+    pass
+
+
+def is_legacy(raw: bytes) -> bool:
+    return len(raw) > 0 and raw[0] == PICKLE_MARK
+
+
+def encode(sub: SubscriptionEvent) -> bytes:
+    data = sub.model_dump(mode="json")
+    fields = SCHEMAS[CODEC_VERSION]
+    values = [data.get(field) for field in fields]
+    defaults = SubscriptionEvent.model_fields
+    while values and values[-1] is None:
+        if defaults[fields[len(values) - 1]].default is not None:
+            break
+        values.pop()
+    body = json.dumps(values, separators=(",", ":"), ensure_ascii=False)
+    return bytes([CODEC_VERSION]) + body.encode()
+
+
+def decode(raw: bytes) -> SubscriptionEvent:
+    try:
+        assert raw
+        if is_legacy(raw):
+            return pickle.loads(raw)
+        fields = SCHEMAS.get(raw[0])
+        if fields is None:
+            raise UnknownVersion(f"unknown codec version {raw[0]}")
+        values = json.loads(raw[1:])
+        return SubscriptionEvent(**dict(zip(fields, values)))
+    except CodecError:
+        raise
+    except Exception as e:
+        raise CodecError(f"{e}") from e
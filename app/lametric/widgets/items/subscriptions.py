@@ -1,9 +1,22 @@
+from bisect import bisect_left, insort
+from contextlib import contextmanager
 import logging
+from threading import RLock, Timer
+from typing import Optional
 from app.botyo.models import SubscriptionEvent
+from app.botyo.livescores import LivescoreSnapshot
+from app.core.metrics import Metrics
+from app.core.tracing import Tracer
+from app.lametric.widgets.items.codec import (
+    CodecError,
+    decode,
+    encode,
+    is_legacy,
+)
 from cachable.storage.redis import RedisStorage
-import pickle
-from app.botyo.client import Client as BotyoClient
-from cachable.storage.redis import RedisStorage
+
+
+FLUSH_INTERVAL = 1
 
 
 class Scores(dict):
@@ -29,6 +42,8 @@ class Subscriptions(dict):
 
     __storage_key: str
     __scores: Scores
+    __dirty: dict[str, Optional[SubscriptionEvent]]
+    __loaded = False
     instances: dict[str, 'Subscriptions'] = {}
 
     def __new__(cls, storage_key, *args, **kwds):
@@ -39,58 +54,164 @@ class Subscriptions(dict):
 
     @classmethod
     def _load(cls, storage_key) -> dict[str, SubscriptionEvent]:
-        data = RedisStorage.hgetall(storage_key)
+        with Metrics.track("redis_request", op="hgetall"):
+            data = RedisStorage.hgetall(storage_key)
         if not data:
             return {}
-        items = {k.decode(): pickle.loads(v) for k, v in data.items()}
+        items = {}
+        legacy = []
+        for k, v in data.items():
+            try:
+                items[k.decode()] = decode(v)
+                if is_legacy(v):
+                    legacy.append(k.decode())
+            except CodecError as e:
+                logging.error(f">>> SKIP {storage_key} {k} {e}")
+        if legacy:
+            store = RedisStorage.pipeline()
+            for k in legacy:
+                store.hset(storage_key, k, encode(items[k]))
+            with Metrics.track("redis_request", op="migrate"):
+                store.persist(storage_key).execute()
         return items
 
     def __init__(self, storage_key, *args, **kwds):
+        if self.__loaded:
+            return
+        self.__loaded = True
         self.__storage_key = storage_key
         self.__scores = Scores({})
+        self.__dirty = {}
+        self.__scores_version = -1
+        self.__depth = 0
+        self.__timer = None
+        self.__lock = RLock()
+        self.__order = []
+        self.__ordered = None
+        self.__starts = {}
+        self.__jobs = {}
+        self.__event_ids = {}
         items = self.__class__._load(storage_key)
         super().__init__(items, *args, **kwds)
+        for k, v in items.items():
+            self.__index(k, v)
+
+    def __index(self, k: str, v: SubscriptionEvent):
+        self.__unindex(k)
+        key = (v.start_time, k)
+        insort(self.__order, key)
+        self.__ordered = None
+        self.__starts[k] = key
+        self.__jobs[v.jobId] = k
+        self.__event_ids[f"{v.event_id}"] = k
+
+    def __unindex(self, k: str):
+        key = self.__starts.pop(k, None)
+        if not key:
+            return
+        idx = bisect_left(self.__order, key)
+        if idx < len(self.__order) and self.__order[idx] == key:
+            del self.__order[idx]
+        self.__ordered = None
+        v = super().get(k)
+        if v and self.__jobs.get(v.jobId) == k:
+            del self.__jobs[v.jobId]
+        if v and self.__event_ids.get(f"{v.event_id}") == k:
+            del self.__event_ids[f"{v.event_id}"]
 
     def __setitem__(self, __k, __v) -> None:
-        RedisStorage.pipeline().hset(
-            self.__storage_key, __k, pickle.dumps(__v)
-        ).persist(
-            self.__storage_key
-        ).execute()
-        if __v.score:
-            self.__scores[__k] = __v.score
-        return super().__setitem__(__k, __v)
+        with self.__lock:
+            self.__dirty[__k] = __v
+            if __v.score:
+                self.__scores[__k] = __v.score
+            self.__index(__k, __v)
+            super().__setitem__(__k, __v)
+        self.__schedule()
 
     def __delitem__(self, __v) -> None:
-        RedisStorage.pipeline().hdel(self.__storage_key, __v).persist(
-            self.__storage_key
-        ).execute()
-        return super().__delitem__(__v)
+        with self.__lock:
+            self.__unindex(__v)
+            super().__delitem__(__v)
+            self.__dirty[__v] = None
+        self.__schedule()
+
+    def by_job_id(self, job_id: str) -> Optional[SubscriptionEvent]:
+        k = self.__jobs.get(job_id)
+        return super().get(k) if k else None
+
+    def by_event_id(self, event_id) -> Optional[SubscriptionEvent]:
+        k = self.__event_ids.get(f"{event_id}")
+        return super().get(k) if k else None
+
+    def __schedule(self):
+        with self.__lock:
+            if self.__depth or self.__timer or not self.__dirty:
+                return
+            self.__timer = Timer(FLUSH_INTERVAL, self.flush)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    @contextmanager
+    def batch(self):
+        with self.__lock:
+            self.__depth += 1
+        try:
+            yield self
+        finally:
+            with self.__lock:
+                self.__depth -= 1
+                done = not self.__depth
+            if done:
+                self.flush()
+
+    def flush(self):
+        with self.__lock:
+            if self.__timer:
+                self.__timer.cancel()
+                self.__timer = None
+            if not self.__dirty:
+                return
+            dirty = self.__dirty
+            self.__dirty = {}
+            store = RedisStorage.pipeline()
+            for k, v in dirty.items():
+                if v is None:
+                    store.hdel(self.__storage_key, k)
+                else:
+                    store.hset(self.__storage_key, k, encode(v))
+            with Metrics.track("redis_request", op="flush"):
+                store.persist(self.__storage_key).execute()
+            Tracer.mark("redis")
+
+    @classmethod
+    def flush_all(cls):
+        for subscriptions in cls.instances.values():
+            subscriptions.flush()
 
     def __load_scores(self):
-        data = BotyoClient.livescores()
-        ids = [x.id for x in self.events]
-        events = list(filter(lambda x: x.id in ids, data))
-        if not len(events):
+        version = LivescoreSnapshot.version
+        if version == self.__scores_version:
             return
-        store = RedisStorage.pipeline()
-        for event in events:
-            try:
-                text = event.displayScore
-                sub = next(filter(lambda x: x.id ==
-                           event.id, self.events), None)
-                assert isinstance(sub, SubscriptionEvent)
-                assert isinstance(event.displayStatus, str)
-                sub.status = event.displayStatus
-                store.hset(self.__storage_key, sub.id, pickle.dumps(sub))
-                self.__scores[event.id] = text
-            except AssertionError:
-                pass
-        store.persist(self.__storage_key).execute()
+        self.__scores_version = version
+        with self.batch():
+            for sub in self.events:
+                try:
+                    event = LivescoreSnapshot.get(sub.id)
+                    assert event
+                    assert isinstance(event.displayStatus, str)
+                    sub.status = event.displayStatus
+                    with self.__lock:
+                        self.__dirty[sub.id] = sub
+                    self.__scores[event.id] = event.displayScore
+                except AssertionError:
+                    pass
 
     @property
     def events(self) -> list[SubscriptionEvent]:
-        return sorted(super().values(), key=lambda x: x.start_time)
+        if self.__ordered is None:
+            get = super().__getitem__
+            self.__ordered = [get(k) for _, k in self.__order]
+        return self.__ordered
 
     @property
     def scores(self) -> Scores:
@@ -4,9 +4,8 @@ from app.lametric.models import (
     ContentFrame,
     Notification,
     STORAGE_KEY,
-    Widget,
 )
-from .base import SubscriptionWidget, WidgetMeta
+from .base import ROUTE, SubscriptionWidget, WidgetMeta
 from app.botyo.models import (
     SubscriptionEvent,
     CancelJobEvent,
@@ -27,8 +26,7 @@ from cachable.storage.redis import RedisStorage
 
 
 class BaseLivescoresWidget(SubscriptionWidget):
-    def __init__(self, widget_id: str, widget: Widget, **kwargs):
-        super().__init__(widget_id, widget, **kwargs)
+    def warm_up(self):
         self.post_init()
         self.update_frames()
 
@@ -45,9 +43,10 @@ class BaseLivescoresWidget(SubscriptionWidget):
 
     def clear_all(self):
         logging.debug("TRIGGER CLEAR ALL")
-        for sub in list(self.subscriptions.values()):
-            self.cancel_sub(sub)
-            del self.subscriptions[sub.id]
+        with self.subscriptions.batch():
+            for sub in list(self.subscriptions.values()):
+                self.cancel_sub(sub)
+                del self.subscriptions[sub.id]
 
     def clear_finished(self):
         for sub in self.subscriptions.values():
@@ -66,8 +65,9 @@ class BaseLivescoresWidget(SubscriptionWidget):
             if sub.isExpired:
                 expired.append(k)
         if expired:
-            for id in expired:
-                del self.subscriptions[id]
+            with self.subscriptions.batch():
+                for id in expired:
+                    del self.subscriptions[id]
             self.update_frames()
 
     def duration(self, duration: int):
@@ -95,65 +95,66 @@ class BaseLivescoresWidget(SubscriptionWidget):
         except AttributeError as e:
             logging.error(e)
         logging.debug(frames)
-        self.__class__.client.send_model(self.app_name, Content(frames=frames))
+        self.__class__.client.writer(self.app_name).write(Content(frames=frames))
 
     def on_match_events(self, events: list[MatchEvent]):
-        for event in events:
-            if event.is_old_event:
-                continue
-            try:
-                logging.debug(event)
-                sub = self.subscriptions[event.id]
-                assert isinstance(sub, SubscriptionEvent)
-                if sub.status == "FT":
+        with self.subscriptions.batch():
+            for event in events:
+                if event.is_old_event:
                     continue
-                act = ACTION(event.action)
-                match act:
-                    case ACTION.FULL_TIME:
-                        sub.status = "FT"
-                        sub.display_event_name = None
-                        self.cancel_sub(sub)
-                    case ACTION.HALF_TIME:
-                        sub.status = "HT"
-                    case ACTION.PROGRESS:
-                        if event.event_name:
-                            sub.display_event_name = event.event_name.replace(
-                                "/", " / "
-                            )
-                        match event.event_status:
-                            case MatchEventStatus.HALF_TIME:
-                                sub.status = MatchEventStatus.HALF_TIME.value
-                                self.subscriptions[event.id] = sub
-                            case MatchEventStatus.FINAL:
-                                sub.status = MatchEventStatus.FINAL.value
-                                self.subscriptions[event.id] = sub
-                            case _:
-                                sub.status = f"{event.time}'"
-                    case _:
-                        icon = sub.icon
-                        assert isinstance(icon, str)
-                        frame = event.getContentFrame(league_icon=icon)
-                        self.__class__.client.send_notification(
-                            Notification(
-                                model=Content(frames=[frame], sound=event.sound),
-                                priority="critical",
+                try:
+                    logging.debug(event)
+                    sub = self.subscriptions[event.id]
+                    assert isinstance(sub, SubscriptionEvent)
+                    if sub.status == "FT":
+                        continue
+                    act = ACTION(event.action)
+                    match act:
+                        case ACTION.FULL_TIME:
+                            sub.status = "FT"
+                            sub.display_event_name = None
+                            self.cancel_sub(sub)
+                        case ACTION.HALF_TIME:
+                            sub.status = "HT"
+                        case ACTION.PROGRESS:
+                            if event.event_name:
+                                sub.display_event_name = event.event_name.replace(
+                                    "/", " / "
+                                )
+                            match event.event_status:
+                                case MatchEventStatus.HALF_TIME:
+                                    sub.status = MatchEventStatus.HALF_TIME.value
+                                    self.subscriptions[event.id] = sub
+                                case MatchEventStatus.FINAL:
+                                    sub.status = MatchEventStatus.FINAL.value
+                                    self.subscriptions[event.id] = sub
+                                case _:
+                                    sub.status = f"{event.time}'"
+                        case _:
+                            icon = sub.icon
+                            assert isinstance(icon, str)
+                            frame = event.getContentFrame(league_icon=icon)
+                            self.__class__.client.notify(
+                                Notification(
+                                    model=Content(frames=[frame], sound=event.sound),
+                                    priority="critical",
+                                ),
+                                key=event.notification_key,
+                                priority=event.priority,
                             )
-                        )
-                if event.score:
-                    sub.score = event.score
-                self.subscriptions[event.id] = sub
-            except ValueError as e:
-                logging.exception(e)
-            except KeyError:
-                logging.warn(f">>>MISSING {event.id} {self.__class__}")
-            except AssertionError as e:
-                logging.exception(e)
+                    if event.score:
+                        sub.score = event.score
+                    self.subscriptions[event.id] = sub
+                except ValueError as e:
+                    logging.exception(e)
+                except KeyError:
+                    logging.warn(f">>>MISSING {event.id} {self.__class__}")
+                except AssertionError as e:
+                    logging.exception(e)
         self.update_frames()
 
     def on_cancel_job_event(self, event: CancelJobEvent):
-        sub = next(
-            filter(lambda x: x.jobId == event.jobId, self.subscriptions.events), None
-        )
+        sub = self.subscriptions.by_job_id(event.jobId)
         if sub:
             del self.subscriptions[sub.id]
 
@@ -183,6 +184,7 @@ def cron_func(competition_id: int, storage_key: str):
             func=cron_func,
             trigger="date",
             run_date=n + td,
+            kwargs={"competition_id": competition_id, "storage_key": storage_key},
             replace_existing=True,
             misfire_grace_time=180,
         )
@@ -235,24 +237,14 @@ class WorldCupWidget(BaseLivescoresWidget, metaclass=WidgetMeta):
     def app_name(self) -> APPNAME:
         return APPNAME.WORLDCUP
 
+    @property
+    def route(self):
+        return (ROUTE.LEAGUE, self.item_id)
+
     def post_init(self):
         cron_func(self.item_id, STORAGE_KEY.WORLDCUP.value)
         schedule_cron(self.item_id, STORAGE_KEY.WORLDCUP.value)
 
-    def filter_payload(self, payload):
-
-        if isinstance(payload, list):
-            return list(
-                filter(
-                    lambda x: x.get("league_id", 0) == self.item_id,
-                    payload,
-                )
-            )
-        league_id = payload.get("league_id", 0)
-        if league_id == self.item_id:
-            return payload
-        return None
-
 
 class PremierLeagueWidget(BaseLivescoresWidget, metaclass=WidgetMeta):
     @property
@@ -263,23 +255,14 @@ class PremierLeagueWidget(BaseLivescoresWidget, metaclass=WidgetMeta):
     def app_name(self) -> APPNAME:
         return APPNAME.PREMIER_LEAGUE
 
+    @property
+    def route(self):
+        return (ROUTE.LEAGUE, self.item_id)
+
     def post_init(self):
         schedule_cron(self.item_id, STORAGE_KEY.PREMIER_LEAGUE.value)
         cron_func(self.item_id, STORAGE_KEY.PREMIER_LEAGUE.value)
 
-    def filter_payload(self, payload):
-        if isinstance(payload, list):
-            return list(
-                filter(
-                    lambda x: x.get("league_id", 0) == self.item_id,
-                    payload,
-                )
-            )
-        league_id = payload.get("league_id", 0)
-        if league_id == self.item_id:
-            return payload
-        return None
-
 
 class LaLigaWidget(BaseLivescoresWidget, metaclass=WidgetMeta):
     @property
@@ -290,23 +273,14 @@ class LaLigaWidget(BaseLivescoresWidget, metaclass=WidgetMeta):
     def app_name(self) -> APPNAME:
         return APPNAME.LA_LIGA
 
+    @property
+    def route(self):
+        return (ROUTE.LEAGUE, self.item_id)
+
     def post_init(self):
         schedule_cron(self.item_id, STORAGE_KEY.LA_LIGA.value)
         cron_func(self.item_id, STORAGE_KEY.LA_LIGA.value)
 
-    def filter_payload(self, payload):
-        if isinstance(payload, list):
-            return  list(
-                filter(
-                    lambda x: x.get("league_id", 0) == self.item_id,
-                    payload,
-                )
-            )
-        league_id = payload.get("league_id", 0)
-        if league_id == self.item_id:
-            return payload
-        return None
-
 
 class LivescoresWidget(BaseLivescoresWidget, metaclass=WidgetMeta):
     @property
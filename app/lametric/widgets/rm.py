@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta, timezone
-from .base import WidgetMeta
+from .base import ROUTE, WidgetMeta
 from app.botyo.models import (
     ACTION,
     MatchEvent,
@@ -7,6 +7,7 @@ from app.botyo.models import (
     Status as MatchEventStatus,
 )
 from app.lametric.models import (
+    Widget,
     Content,
     APPNAME,
     Notification,
@@ -22,9 +23,8 @@ import logging
 from app.lametric.widgets.items.subscriptions import Subscriptions
 from random import randint
 from lambo.hue.client import Hue
-from app.config import app_config
-
-Hue.register(hostname=app_config.lambo.hostname, username=app_config.lambo.username)
+from app.core.hue import ensure_hue
+from app.core.metrics import Metrics
 
 
 class TeamSchedule(TimeCacheable):
@@ -89,6 +89,10 @@ def schedule_cron(team_id: int, storage_key: str):
 
 
 class RMWidget(BaseLivescoresWidget, metaclass=WidgetMeta):
+    def __init__(self, widget_id: str, widget: Widget, **kwargs):
+        super().__init__(widget_id, widget, **kwargs)
+        ensure_hue()
+
     @property
     def subscriptions(self) -> Subscriptions:
         res = Subscriptions(STORAGE_KEY.REAL_MADRID.value)
@@ -102,93 +106,90 @@ class RMWidget(BaseLivescoresWidget, metaclass=WidgetMeta):
     def isHidden(self):
         return False
 
+    @property
+    def route(self):
+        return (ROUTE.TEAM, self.item_id)
+
     def post_init(self):
         schedule_cron(self.item_id, STORAGE_KEY.REAL_MADRID.value)
         cron_func(self.item_id, STORAGE_KEY.REAL_MADRID.value)
 
-    def filter_payload(self, payload):
-        if isinstance(payload, list):
-            return list(
-                filter(
-                    lambda x: self.item_id
-                    in [x.get("home_team_id"), x.get("away_team_id")],
-                    payload,
-                )
-            )
-        if self.item_id in [payload.get("home_team_id"), payload.get("away_team_id")]:
-            return payload
-        return None
-
     def on_match_events(self, events: list[MatchEvent]):
-        for event in events:
-            if event.is_old_event:
-                continue
-            try:
-                logging.debug(event)
-                sub = self.subscriptions[event.id]
-                assert isinstance(sub, SubscriptionEvent)
-                if sub.status == "FT":
+        with self.subscriptions.batch():
+            for event in events:
+                if event.is_old_event:
                     continue
-                act = ACTION(event.action)
-                match act:
-                    case ACTION.FULL_TIME:
-                        sub.status = "FT"
-                        sub.display_event_name = None
-                        frame = event.getContentFrame(league_icon=sub.icon)
-                        RMWidget.client.send_notification(
-                            Notification(
-                                model=Content(
-                                    frames=[frame],
-                                    sound=event.getTeamSound(
-                                        self.item_id, self.item_id == event.winner
+                try:
+                    logging.debug(event)
+                    sub = self.subscriptions[event.id]
+                    assert isinstance(sub, SubscriptionEvent)
+                    if sub.status == "FT":
+                        continue
+                    act = ACTION(event.action)
+                    match act:
+                        case ACTION.FULL_TIME:
+                            sub.status = "FT"
+                            sub.display_event_name = None
+                            frame = event.getContentFrame(league_icon=sub.icon)
+                            RMWidget.client.notify(
+                                Notification(
+                                    model=Content(
+                                        frames=[frame],
+                                        sound=event.getTeamSound(
+                                            self.item_id, self.item_id == event.winner
+                                        ),
                                     ),
+                                    priority="critical",
                                 ),
-                                priority="critical",
+                                key=event.notification_key,
+                                priority=event.priority,
                             )
-                        )
-                        self.cancel_sub(sub)
-                    case ACTION.HALF_TIME:
-                        sub.status = "HT"
-                    case ACTION.PROGRESS:
-                        if event.event_name:
-                            sub.display_event_name = event.event_name.replace(
-                                "/", " / "
+                            self.cancel_sub(sub)
+                        case ACTION.HALF_TIME:
+                            sub.status = "HT"
+                        case ACTION.PROGRESS:
+                            if event.event_name:
+                                sub.display_event_name = event.event_name.replace(
+                                    "/", " / "
+                                )
+                            match event.event_status:
+                                case MatchEventStatus.HALF_TIME:
+                                    sub.status = MatchEventStatus.HALF_TIME.value
+                                    self.subscriptions[event.id] = sub
+                                case MatchEventStatus.FINAL:
+                                    sub.status = MatchEventStatus.FINAL.value
+                                    self.subscriptions[event.id] = sub
+                                case _:
+                                    sub.status = f"{event.time}'"
+                        case _:
+                            icon = sub.icon
+                            alert_content = event.getAlertContent(
+                                self.item_id, self.item_id == event.winner
                             )
-                        match event.event_status:
-                            case MatchEventStatus.HALF_TIME:
-                                sub.status = MatchEventStatus.HALF_TIME.value
-                                self.subscriptions[event.id] = sub
-                            case MatchEventStatus.FINAL:
-                                sub.status = MatchEventStatus.FINAL.value
-                                self.subscriptions[event.id] = sub
-                            case _:
-                                sub.status = f"{event.time}'"
-                    case _:
-                        icon = sub.icon
-                        alert_content = event.getAlertContent(
-                            self.item_id, self.item_id == event.winner
-                        )
-                        Hue.signaling(**alert_content.model_dump())
-                        assert isinstance(icon, str)
-                        frame = event.getContentFrame(league_icon=icon)
-                        RMWidget.client.send_notification(
-                            Notification(
-                                model=Content(
-                                    frames=[frame],
-                                    sound=event.getTeamSound(
-                                        self.item_id, self.item_id == event.winner
+                            with Metrics.track("hue_request", endpoint="signaling"):
+                                Hue.signaling(**alert_content.model_dump())
+                            assert isinstance(icon, str)
+                            frame = event.getContentFrame(league_icon=icon)
+                            RMWidget.client.notify(
+                                Notification(
+                                    model=Content(
+                                        frames=[frame],
+                                        sound=event.getTeamSound(
+                                            self.item_id, self.item_id == event.winner
+                                        ),
                                     ),
+                                    priority="critical",
                                 ),
-                                priority="critical",
+                                key=event.notification_key,
+                                priority=event.priority,
                             )
-                        )
-                if event.score:
-                    sub.score = event.score
-                self.subscriptions[event.id] = sub
-            except ValueError as e:
-                logging.exception(e)
-            except KeyError:
-                logging.debug(f">>>MISSING {event.id} {self.__class__}")
-            except AssertionError as e:
-                logging.exception(e)
+                    if event.score:
+                        sub.score = event.score
+                    self.subscriptions[event.id] = sub
+                except ValueError as e:
+                    logging.exception(e)
+                except KeyError:
+                    logging.debug(f">>>MISSING {event.id} {self.__class__}")
+                except AssertionError as e:
+                    logging.exception(e)
         self.update_frames()
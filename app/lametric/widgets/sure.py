@@ -57,7 +57,9 @@ class SureWidget(BaseWidget, metaclass=WidgetMeta):
                     index=1,
                 ),
             ]
-            SureWidget.client.send_model_api2(APPNAME.SURE, Content(frames=self.nextFrames))
+            SureWidget.client.writer(APPNAME.SURE, api2=True).write(
+                Content(frames=self.nextFrames)
+            )
             return True
         except AssertionError as e:
             logging.exception(e)
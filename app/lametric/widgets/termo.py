@@ -65,7 +65,9 @@ class TermoWidget(BaseWidget, metaclass=WidgetMeta):
                     text=f"{data.humid}%", icon=data.humud_icon, duration=8, index=1
                 ),
             ]
-            TermoWidget.client.send_model_api2(APPNAME.TERMO, Content(frames=self.nextFrames))
+            TermoWidget.client.writer(APPNAME.TERMO, api2=True).write(
+                Content(frames=self.nextFrames)
+            )
             return True
         except AssertionError as e:
             pass
@@ -4,6 +4,7 @@ from app.lametric.models import (
     Notification,
     Content,
     MUSIC_STATUS,
+    NOTIFICATION_PRIORITY,
     APPNAME
 )
 from app.yanko import Yanko
@@ -14,12 +15,14 @@ import logging
 
 class YankoWidget(BaseWidget, metaclass=WidgetMeta):
 
-    status: MUSIC_STATUS
+    status: MUSIC_STATUS = MUSIC_STATUS.STOPPED
 
     def __init__(self, widget_id: str, widget: Widget, **kwargs):
         super().__init__(widget_id, widget, **kwargs)
         EventManager.listen(BUTTON_EVENTS.YANKO_PLAY_PAUSE, Yanko.toggle)
         EventManager.listen(BUTTON_EVENTS.YANKO_NEXT, Yanko.next)
+
+    def warm_up(self):
         self.yankostatus(Yanko.state())
 
     def onShow(self):
@@ -35,13 +38,17 @@ class YankoWidget(BaseWidget, metaclass=WidgetMeta):
     def nowplaying(self, payload):
         frame = NowPlayingFrame(**payload)
         self.status = MUSIC_STATUS.PLAYING
-        YankoWidget.client.send_notification(Notification(
-            model=Content(
-                frames=[frame],
+        YankoWidget.client.notify(
+            Notification(
+                model=Content(
+                    frames=[frame],
+                ),
+                priority='critical'
             ),
-            priority='critical'
-        ))
-        YankoWidget.client.send_model(APPNAME.YANKO, Content(frames=[frame]))
+            key=APPNAME.YANKO.value,
+            priority=NOTIFICATION_PRIORITY.INFO,
+        )
+        YankoWidget.client.writer(APPNAME.YANKO).write(Content(frames=[frame]))
         return True
 
     def yankostatus(self, payload):
@@ -0,0 +1,107 @@
+import json
+import logging
+from threading import Lock
+from time import monotonic
+from typing import Callable, Optional
+
+from app.lametric.models import APPNAME, Content
+
+
+class FrameWriter(object):
+
+    __lock: Lock
+    __pending: Optional[Content] = None
+    __due_at: Optional[float] = None
+    __last_payload: Optional[bytes] = None
+    __sent_at: float = float("-inf")
+    __sending = False
+
+    def __init__(
+        self,
+        appname: APPNAME,
+        serialize: Callable[[Content], dict],
+        send: Callable[[dict], Optional[int]],
+        window: float,
+        on_pending: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.appname = appname
+        self.__serialize = serialize
+        self.__send = send
+        self.__on_pending = on_pending
+        self.__lock = Lock()
+        self.window = window
+        self.requested = 0
+        self.coalesced = 0
+        self.suppressed = 0
+        self.sent = 0
+        self.failed = 0
+
+    @property
+    def due_at(self) -> Optional[float]:
+        return self.__due_at
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return dict(
+            requested=self.requested,
+            coalesced=self.coalesced,
+            suppressed=self.suppressed,
+            sent=self.sent,
+            failed=self.failed,
+        )
+
+    def write(self, model: Content):
+        now = monotonic()
+        with self.__lock:
+            self.requested += 1
+            held = self.__pending is None
+            if held:
+                self.__due_at = max(now, self.__sent_at + self.window)
+            else:
+                self.coalesced += 1
+            self.__pending = model
+            due = self.__due_at <= now
+        if due:
+            self.flush()
+        elif held and self.__on_pending:
+            self.__on_pending()
+
+    def flush(self, force: bool = False):
+        with self.__lock:
+            try:
+                assert not self.__sending
+                assert self.__pending is not None
+                assert self.__due_at is not None
+                assert force or self.__due_at <= monotonic()
+            except AssertionError:
+                return
+            model = self.__pending
+            self.__pending = None
+            self.__due_at = None
+            data = self.__serialize(model)
+            payload = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+            if payload == self.__last_payload:
+                self.suppressed += 1
+                return
+            self.__sending = True
+            self.__sent_at = monotonic()
+        try:
+            status = self.__send(data)
+        except Exception as e:
+            logging.error(f">>> {self.appname} frame push error {e}")
+            status = None
+        with self.__lock:
+            self.__sending = False
+            if status and 200 <= status < 300:
+                self.__last_payload = payload
+                self.sent += 1
+                return
+            self.failed += 1
+            if self.__pending is None:
+                self.__pending = model
+                self.__due_at = self.__sent_at + self.window
+        logging.warning(
+            f">>> {self.appname} frame push failed {status}, retry in {self.window}s"
+        )
+        if self.__on_pending:
+            self.__on_pending()
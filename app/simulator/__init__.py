@@ -0,0 +1,380 @@
+from collections import deque
+from enum import StrEnum
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+import json
+import logging
+from random import Random
+import re
+from threading import Lock, Thread
+from time import perf_counter, sleep, time
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import BaseModel
+from requests.auth import _basic_auth_str
+
+from app.config import LametricConfig, SimulatorConfig, SimulatorFault
+
+API_PREFIX = "/api/v2/"
+PUSH_PREFIX = "/api/v1/dev/widget/update/"
+CONTROL_PREFIX = "/simulator/"
+
+ACTIVATE_PATH = re.compile(
+    r"^device/apps/(?P<package>[^/]+)/widgets/(?P<widget_id>[^/]+)/activate$"
+)
+UPDATE_PATH = re.compile(r"^widget/update/(?P<package>[^/]+)/(?P<widget_id>[^/]+)$")
+PUSH_PATH = re.compile(r"^(?P<package>[^/]+)(/(?P<version>[^/]+))?$")
+
+
+class ENDPOINT(StrEnum):
+    DEVICE = "device"
+    APPS = "device/apps"
+    DISPLAY = "device/display"
+    NOTIFICATIONS = "device/notifications"
+    ACTIVATE = "activate"
+    WIDGET_UPDATE = "widget/update"
+    PUSH = "push"
+    UNKNOWN = "unknown"
+
+
+class RecordedRequest(BaseModel):
+    at: float
+    method: str
+    path: str
+    endpoint: ENDPOINT
+    status: int
+    latency_ms: float
+    body: Optional[Any] = None
+
+
+def success(path: str, data: Optional[dict] = None) -> dict:
+    return {"success": {"data": data or {}, "path": path}}
+
+
+def error(message: str) -> dict:
+    return {"errors": [{"message": message}]}
+
+
+class Device(object):
+
+    def __init__(self, config: LametricConfig) -> None:
+        self.config = config
+        self.mode = "auto"
+        self.active: Optional[str] = None
+        self.activations = 0
+        self.notifications: deque[dict] = deque(maxlen=100)
+        self.frames: dict[str, Any] = {}
+        self.apps = self.__apps()
+        self.display = dict(
+            brightness=80,
+            brightness_mode="auto",
+            screensaver=dict(
+                enabled=False,
+                modes=dict(
+                    time_based=dict(
+                        enabled=True,
+                        start_time="23:00:00",
+                        end_time="07:00:00",
+                        local_start_time="23:00:00",
+                        local_end_time="07:00:00",
+                    )
+                ),
+            ),
+        )
+        self.__authorization = _basic_auth_str(config.user, config.apikey)
+        self.__tokens = {x.package: x.token for x in config.apps.values() if x.token}
+        self.__seq = count(1)
+        self.__lock = Lock()
+
+    def __apps(self) -> dict[str, dict]:
+        res = {}
+        for app in self.config.apps.values():
+            item = res.setdefault(
+                app.package,
+                dict(
+                    package=app.package,
+                    title=app.package.split(".")[-1],
+                    vendor="LaMetric",
+                    version="1.0.0",
+                    version_code="1",
+                    widgets={},
+                ),
+            )
+            item["widgets"][app.widget_id] = dict(
+                index=app.index or len(item["widgets"]), package=app.package
+            )
+        return res
+
+    def authorized(self, headers) -> bool:
+        return headers.get("Authorization") == self.__authorization
+
+    def token_valid(self, package: str, headers) -> bool:
+        token = self.__tokens.get(package)
+        return token is not None and headers.get("X-Access-Token") == token
+
+    def has_widget(self, package: str, widget_id: str) -> bool:
+        app = self.apps.get(package)
+        return app is not None and widget_id in app["widgets"]
+
+    def api(self, method: str, endpoint: str, body: Any) -> tuple[int, dict]:
+        path = f"{API_PREFIX}{endpoint}"
+        data = body if isinstance(body, dict) else {}
+        with self.__lock:
+            match (method, endpoint):
+                case ("GET", "device"):
+                    return 200, dict(
+                        id="simulator",
+                        name="LaMetric Simulator",
+                        serial_number="SA000000000000",
+                        os_version="2.3.9",
+                        mode=self.mode,
+                        model="LM 37X8",
+                        display=self.display,
+                    )
+                case ("PUT", "device"):
+                    self.mode = data.get("mode", self.mode)
+                    return 200, success(path, dict(mode=self.mode))
+                case ("GET", "device/apps"):
+                    return 200, self.apps
+                case ("GET", "device/display"):
+                    return 200, self.display
+                case ("PUT", "device/display"):
+                    self.display.update(data)
+                    return 200, success(path, self.display)
+                case ("POST", "device/notifications"):
+                    seq = next(self.__seq)
+                    self.notifications.append(dict(data, id=seq, at=time()))
+                    return 201, {"success": {"id": f"{seq}"}}
+            activate = ACTIVATE_PATH.match(endpoint)
+            if method == "PUT" and activate:
+                package, widget_id = activate["package"], activate["widget_id"]
+                if not self.has_widget(package, widget_id):
+                    return 404, error(f"Widget {package}/{widget_id} not found")
+                self.active = f"{package}/{widget_id}"
+                self.activations += 1
+                return 200, success(path)
+            update = UPDATE_PATH.match(endpoint)
+            if method == "POST" and update:
+                self.frames[update["package"]] = body
+                return 200, success(path)
+        return 404, error(f"{method} {path} not found")
+
+    def push(self, package: str, body: Any) -> tuple[int, dict]:
+        with self.__lock:
+            self.frames[package] = body
+        return 200, success(f"{PUSH_PREFIX}{package}")
+
+    @property
+    def state(self) -> dict:
+        with self.__lock:
+            return dict(
+                mode=self.mode,
+                active=self.active,
+                activations=self.activations,
+                notifications=list(self.notifications),
+                frames=dict(self.frames),
+            )
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "SimulatorServer"
+
+    def do_GET(self):
+        self.server.simulator.handle(self)
+
+    do_PUT = do_GET
+    do_POST = do_GET
+    do_DELETE = do_GET
+
+    def body(self) -> Any:
+        length = int(self.headers.get("Content-Length", 0))
+        if not length:
+            return None
+        data = self.rfile.read(length)
+        try:
+            return json.loads(data)
+        except ValueError:
+            return data.decode(errors="replace")
+
+    def reply(self, status: int, payload: Any):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", f"{len(data)}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args):
+        logging.debug(f">>> SIMULATOR {self.address_string()} {format % args}")
+
+
+class SimulatorServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+    simulator: "Simulator"
+
+
+class Simulator(object):
+
+    def __init__(self, lametric: LametricConfig, config: SimulatorConfig) -> None:
+        self.config = config
+        self.device = Device(lametric)
+        self.__records: deque[RecordedRequest] = deque(maxlen=config.record)
+        self.__counts: dict[tuple[str, int], int] = {}
+        self.__random = Random()
+        self.__lock = Lock()
+        self.__server: Optional[SimulatorServer] = None
+
+    @property
+    def url(self) -> str:
+        assert self.__server
+        host, port = self.__server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, port: Optional[int] = None) -> str:
+        port = self.config.port if port is None else port
+        self.__server = SimulatorServer((self.config.host, port), Handler)
+        self.__server.simulator = self
+        Thread(target=self.__server.serve_forever, daemon=True).start()
+        logging.info(f">>> SIMULATOR listening on {self.url}")
+        return self.url
+
+    def stop(self):
+        if self.__server:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+
+    def fault(self, endpoint: ENDPOINT) -> SimulatorFault:
+        return self.config.endpoints.get(endpoint.value, self.config.fault)
+
+    def route(self, path: str) -> tuple[ENDPOINT, Optional[str]]:
+        if path.startswith(PUSH_PREFIX):
+            push = PUSH_PATH.match(path.removeprefix(PUSH_PREFIX))
+            return ENDPOINT.PUSH, push["package"] if push else None
+        if not path.startswith(API_PREFIX):
+            return ENDPOINT.UNKNOWN, None
+        endpoint = path.removeprefix(API_PREFIX)
+        if ACTIVATE_PATH.match(endpoint):
+            return ENDPOINT.ACTIVATE, endpoint
+        if UPDATE_PATH.match(endpoint):
+            return ENDPOINT.WIDGET_UPDATE, endpoint
+        try:
+            return ENDPOINT(endpoint), endpoint
+        except ValueError:
+            return ENDPOINT.UNKNOWN, endpoint
+
+    def handle(self, request: Handler):
+        url = urlparse(request.path)
+        if url.path.startswith(CONTROL_PREFIX):
+            return self.control(request, url.path.removeprefix(CONTROL_PREFIX), url.query)
+        started = perf_counter()
+        method = request.command
+        body = request.body()
+        endpoint, target = self.route(url.path)
+        fault = self.fault(endpoint)
+        with self.__lock:
+            hang, drop, fail = (self.__random.random() for _ in range(3))
+            delay = max(0, self.__random.gauss(fault.latency, fault.jitter))
+        if hang < fault.hang_rate:
+            delay += fault.hang
+        sleep(delay)
+        if drop < fault.drop_rate:
+            request.close_connection = True
+            self.record(method, url.path, endpoint, 0, started, body)
+            return
+        if fail < fault.error_rate:
+            status, payload = fault.error_status, error("Simulated failure")
+        elif endpoint == ENDPOINT.PUSH:
+            if not target or not self.device.token_valid(target, request.headers):
+                status, payload = 401, error("Invalid access token")
+            else:
+                status, payload = self.device.push(target, body)
+        elif endpoint == ENDPOINT.UNKNOWN and target is None:
+            status, payload = 404, error(f"{url.path} not found")
+        elif not self.device.authorized(request.headers):
+            status, payload = 401, error("Authorization is required")
+        else:
+            status, payload = self.device.api(method, target or "", body)
+        request.reply(status, payload)
+        self.record(method, url.path, endpoint, status, started, body)
+
+    def record(
+        self,
+        method: str,
+        path: str,
+        endpoint: ENDPOINT,
+        status: int,
+        started: float,
+        body: Any,
+    ):
+        item = RecordedRequest(
+            at=time(),
+            method=method,
+            path=path,
+            endpoint=endpoint,
+            status=status,
+            latency_ms=round((perf_counter() - started) * 1000, 3),
+            body=body,
+        )
+        with self.__lock:
+            self.__records.append(item)
+            key = (endpoint.value, status)
+            self.__counts[key] = self.__counts.get(key, 0) + 1
+        logging.debug(f">>> SIMULATOR {method} {path} {status}")
+
+    def requests(
+        self, endpoint: Optional[ENDPOINT] = None, limit: Optional[int] = None
+    ) -> list[RecordedRequest]:
+        with self.__lock:
+            res = [x for x in self.__records if not endpoint or x.endpoint == endpoint]
+        return res[-limit:] if limit else res
+
+    @property
+    def stats(self) -> dict[str, dict[str, int]]:
+        res: dict[str, dict[str, int]] = {}
+        with self.__lock:
+            for (endpoint, status), hits in self.__counts.items():
+                res.setdefault(endpoint, {})[f"{status}"] = hits
+        return res
+
+    def reset(self):
+        with self.__lock:
+            self.__records.clear()
+            self.__counts.clear()
+
+    def control(self, request: Handler, path: str, query: str):
+        params = {k: v[-1] for k, v in parse_qs(query).items()}
+        match (request.command, path):
+            case ("GET", "requests"):
+                try:
+                    endpoint = ENDPOINT(params["endpoint"]) if "endpoint" in params else None
+                    limit = int(params.get("limit", 100))
+                except ValueError as e:
+                    return request.reply(400, error(f"{e}"))
+                items = self.requests(endpoint, limit)
+                return request.reply(200, [x.model_dump(mode="json") for x in items])
+            case ("DELETE", "requests"):
+                self.reset()
+                return request.reply(200, {"status": "ok"})
+            case ("GET", "stats"):
+                return request.reply(200, self.stats)
+            case ("GET", "state"):
+                return request.reply(200, self.device.state)
+            case ("GET", "faults"):
+                return request.reply(200, self.config.model_dump(include={"fault", "endpoints"}))
+            case ("PUT", "faults"):
+                try:
+                    update = SimulatorConfig(
+                        **{**self.config.model_dump(), **(request.body() or {})}
+                    )
+                except (TypeError, ValueError) as e:
+                    return request.reply(422, error(f"{e}"))
+                self.config.fault = update.fault
+                self.config.endpoints = update.endpoints
+                return request.reply(200, self.config.model_dump(include={"fault", "endpoints"}))
+        request.reply(404, error(f"{CONTROL_PREFIX}{path} not found"))
@@ -0,0 +1,41 @@
+import logging
+from threading import Event
+
+import typer
+
+from app.config import app_config
+from app.simulator import Simulator
+
+cli = typer.Typer()
+
+
+@cli.command()
+def serve(
+    port: int = app_config.simulator.port,
+    latency: float = app_config.simulator.fault.latency,
+    jitter: float = app_config.simulator.fault.jitter,
+    error_rate: float = app_config.simulator.fault.error_rate,
+    drop_rate: float = app_config.simulator.fault.drop_rate,
+    hang_rate: float = app_config.simulator.fault.hang_rate,
+) -> None:
+    config = app_config.simulator.model_copy(deep=True)
+    config.fault = config.fault.model_copy(
+        update=dict(
+            latency=latency,
+            jitter=jitter,
+            error_rate=error_rate,
+            drop_rate=drop_rate,
+            hang_rate=hang_rate,
+        )
+    )
+    simulator = Simulator(app_config.lametric, config)
+    simulator.start(port)
+    try:
+        Event().wait()
+    except KeyboardInterrupt:
+        logging.info(f">>> SIMULATOR {simulator.stats}")
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,4 +1,5 @@
 from app.config import app_config
+from app.core.metrics import Metrics
 from app.core.otp import OTP
 from requests import request
 from enum import Enum
@@ -44,12 +45,13 @@ class Yanko(object, metaclass=YankoMeta):
 
     def make_request(self, method: Method, endpoint: Endpoints, **kwags):
         try:
-            resp = request(
-                method=method.value,
-                url=f"{self.__host}/{endpoint.value}",
-                headers=self.__otp.headers,
-                **kwags,
-            )
-            return resp.json()
+            with Metrics.track("yanko_request", endpoint=endpoint.value):
+                resp = request(
+                    method=method.value,
+                    url=f"{self.__host}/{endpoint.value}",
+                    headers=self.__otp.headers,
+                    **kwags,
+                )
+                return resp.json()
         except Exception as e:
             return {"status": MUSIC_STATUS.STOPPED}
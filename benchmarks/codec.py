@@ -0,0 +1,62 @@
+import pickle
+from datetime import datetime, timedelta, timezone
+from statistics import mean
+import time
+
+import app.lametric  # noqa: F401 - resolves the app.botyo.models cycle
+from app.lametric.widgets.items.codec import decode, encode
+from app.botyo.models import SubscriptionEvent
+
+ROUNDS = 2000
+
+
+def subscription(idx: int) -> SubscriptionEvent:
+    return SubscriptionEvent(
+        id=f"{idx:032x}",
+        action="Subscribed",
+        league="LaLiga",
+        league_id=8,
+        home_team="Real Madrid",
+        home_team_id=131,
+        away_team="Barcelona",
+        away_team_id=132,
+        event_id=4000000 + idx,
+        event_name="Real Madrid/Barcelona",
+        job_id=f"{idx:032x}:livescore",
+        icon="https://example.com/icons/laliga.png",
+        start_time=datetime.now(tz=timezone.utc) + timedelta(hours=idx % 24),
+        status="NS",
+        score="1:0",
+        home_team_icon="https://example.com/icons/131.png",
+    )
+
+
+def timed(func, items) -> float:
+    started = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - started) / len(items) * 1_000_000
+
+
+if __name__ == "__main__":
+    subs = [subscription(idx) for idx in range(ROUNDS)]
+    pickled = [pickle.dumps(x) for x in subs]
+    encoded = [encode(x) for x in subs]
+    assert decode(encoded[0]) == subs[0]
+    assert decode(pickled[0]) == subs[0]
+    print(
+        "pickle",
+        {
+            "encode_us": round(timed(pickle.dumps, subs), 2),
+            "decode_us": round(timed(pickle.loads, pickled), 2),
+            "bytes": round(mean(map(len, pickled)), 1),
+        },
+    )
+    print(
+        "codec v1",
+        {
+            "encode_us": round(timed(encode, subs), 2),
+            "decode_us": round(timed(decode, encoded), 2),
+            "bytes": round(mean(map(len, encoded)), 1),
+        },
+    )
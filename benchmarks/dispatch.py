@@ -0,0 +1,58 @@
+from queue import Empty
+from random import uniform
+from statistics import mean, quantiles
+from threading import Thread
+import time
+
+from app.config import IngressQueueConfig
+from app.lametric.queue import EventQueue
+
+EVENTS = 50
+IDLE_SECONDS = 5
+
+
+def poll_loop(queue: EventQueue, latencies: list[float], stats: dict):
+    while len(latencies) < EVENTS:
+        stats["wakeups"] += 1
+        try:
+            queue.get_nowait()
+            latencies.append(queue.last_wait)
+        except Empty:
+            time.sleep(0.2)
+
+
+def blocking_loop(queue: EventQueue, latencies: list[float], stats: dict):
+    while len(latencies) < EVENTS:
+        stats["wakeups"] += 1
+        try:
+            queue.get(timeout=IDLE_SECONDS * 2)
+            latencies.append(queue.last_wait)
+        except Empty:
+            pass
+
+
+def run(loop) -> dict:
+    queue = EventQueue(IngressQueueConfig(maxsize=EVENTS))
+    latencies: list[float] = []
+    stats = {"wakeups": 0}
+    consumer = Thread(target=loop, args=(queue, latencies, stats), daemon=True)
+    consumer.start()
+    time.sleep(IDLE_SECONDS)
+    idle_wakeups = stats["wakeups"]
+    for idx in range(EVENTS):
+        queue.put_nowait(("event", idx))
+        time.sleep(uniform(0.01, 0.3))
+    consumer.join()
+    ms = [x * 1000 for x in latencies]
+    pct = quantiles(ms, n=100)
+    return {
+        "mean_ms": round(mean(ms), 3),
+        "p50_ms": round(pct[49], 3),
+        "p99_ms": round(pct[98], 3),
+        "idle_wakeups_per_s": round(idle_wakeups / IDLE_SECONDS, 2),
+    }
+
+
+if __name__ == "__main__":
+    print("poll (200 ms sleep)", run(poll_loop))
+    print("blocking get", run(blocking_loop))
@@ -0,0 +1,53 @@
+import json
+from time import monotonic
+from typing import Any
+from urllib.parse import urlparse
+
+import fakeredis
+from cachable.storage.redis import RedisStorage
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_BODY = {"success": {}}
+
+
+def use_fakeredis() -> fakeredis.FakeRedis:
+    redis = fakeredis.FakeRedis()
+    for name in ("hgetall", "pipeline"):
+        setattr(RedisStorage, name, getattr(redis, name))
+    return redis
+
+
+class StubHTTP(object):
+
+    def __init__(self, routes: dict[str, Any]) -> None:
+        self.routes = sorted(routes.items(), key=lambda x: len(x[0]), reverse=True)
+        self.calls: dict[str, int] = {}
+        self.sent: list[tuple[str, float]] = []
+
+    def body(self, path: str) -> Any:
+        return next(
+            (body for suffix, body in self.routes if path.endswith(suffix)),
+            DEFAULT_BODY,
+        )
+
+    def send(self, request: PreparedRequest) -> Response:
+        path = urlparse(request.url).path
+        self.calls[path] = self.calls.get(path, 0) + 1
+        self.sent.append((path, monotonic()))
+        body = self.body(path)
+        response = Response()
+        response.status_code = 200
+        response._content = body if isinstance(body, bytes) else json.dumps(body).encode()
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        return response
+
+
+def use_stub_http(routes: dict[str, Any]) -> StubHTTP:
+    stub = StubHTTP(routes)
+    HTTPAdapter.send = lambda adapter, request, **kwds: stub.send(request)
+    return stub
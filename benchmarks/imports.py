@@ -0,0 +1,40 @@
+from statistics import median
+import subprocess
+import sys
+
+ROUNDS = 5
+TOP = 15
+TARGET = "app.core.app"
+
+
+def importtime(target: str) -> dict[str, int]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr.splitlines()[-1:]
+    res = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not name.startswith("  "):
+            name = name.strip()
+            res[name] = res.get(name, 0) + int(cumulative)
+    return res
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else TARGET
+    runs = [importtime(target) for _ in range(ROUNDS)]
+    totals = [sum(x.values()) for x in runs]
+    packages = {}
+    for run in runs:
+        for name, us in run.items():
+            packages.setdefault(name, []).append(us)
+    print(target, {"rounds": ROUNDS, "total_ms": round(median(totals) / 1000, 1)})
+    for name, us in sorted(
+        packages.items(), key=lambda x: median(x[1]), reverse=True
+    )[:TOP]:
+        print(f"{name:<40} {median(us) / 1000:8.1f}ms")
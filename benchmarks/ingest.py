@@ -0,0 +1,84 @@
+import json
+from threading import Thread
+import time
+
+from fastapi import FastAPI
+import requests
+import uvicorn
+
+from app.api.routers.rest import router
+from app.config import IngressQueueConfig
+from app.core.otp import OTP
+from app.lametric import LaMetric
+from app.lametric.queue import EventQueue
+
+EVENTS = 1000
+BATCH = 50
+PORT = 32399
+
+
+def termo(idx: int) -> dict:
+    return {"temp": 20 + idx % 5, "humid": 40.0, "location": "outdoor"}
+
+
+def per_event(session: requests.Session, base: str):
+    for idx in range(EVENTS):
+        session.post(
+            f"{base}/api/termo", json=termo(idx), headers={"x-totp": OTP.api.now}
+        )
+
+
+def batched(session: requests.Session, base: str):
+    for start in range(0, EVENTS, BATCH):
+        records = [["termo", termo(idx)] for idx in range(start, start + BATCH)]
+        session.post(
+            f"{base}/api/events/batch",
+            data=json.dumps(records),
+            headers={"x-totp": OTP.api.now, "content-type": "application/json"},
+        )
+
+
+def ndjson(session: requests.Session, base: str):
+    for start in range(0, EVENTS, BATCH):
+        lines = [
+            json.dumps({"type": "termo", "payload": termo(idx)})
+            for idx in range(start, start + BATCH)
+        ]
+        session.post(
+            f"{base}/api/events/batch",
+            data="\n".join(lines),
+            headers={"x-totp": OTP.api.now, "content-type": "application/x-ndjson"},
+        )
+
+
+def measure(name: str, func, session: requests.Session, base: str) -> dict:
+    LaMetric._queue = EventQueue(IngressQueueConfig(maxsize=EVENTS, overflow={}))
+    started = time.perf_counter()
+    func(session, base)
+    elapsed = time.perf_counter() - started
+    assert LaMetric.queue.qsize() == EVENTS
+    return {
+        "name": name,
+        "seconds": round(elapsed, 3),
+        "events_per_s": round(EVENTS / elapsed, 1),
+    }
+
+
+if __name__ == "__main__":
+    app = FastAPI()
+    app.include_router(router)
+    server = uvicorn.Server(
+        uvicorn.Config(app=app, host="127.0.0.1", port=PORT, log_level="warning")
+    )
+    Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base = f"http://127.0.0.1:{PORT}"
+    with requests.Session() as session:
+        for name, func in [
+            ("per_event", per_event),
+            ("batch_json", batched),
+            ("batch_ndjson", ndjson),
+        ]:
+            print(measure(name, func, session, base))
+    server.should_exit = True
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+from random import shuffle
+import time
+
+import app.lametric  # noqa: F401 - resolves the app.botyo.models cycle
+from app.lametric.widgets.items.subscriptions import Subscriptions
+from app.botyo.models import LivescoreEvent, SubscriptionEvent
+from benchmarks.fakes import use_fakeredis
+
+SIZES = (10, 100, 1000)
+ROUNDS = 200
+
+
+def subscription(idx: int) -> SubscriptionEvent:
+    return SubscriptionEvent(
+        id=f"{idx:032x}",
+        action="Subscribed",
+        league="LaLiga",
+        league_id=8,
+        home_team=f"Home {idx}",
+        home_team_id=idx,
+        away_team=f"Away {idx}",
+        away_team_id=idx + 10000,
+        event_id=4000000 + idx,
+        event_name=f"Home {idx}/Away {idx}",
+        job_id=f"{idx:032x}:livescore",
+        icon="",
+        start_time=datetime.now(tz=timezone.utc) + timedelta(minutes=idx),
+    )
+
+
+def livescore(sub: SubscriptionEvent) -> LivescoreEvent:
+    return LivescoreEvent(
+        id=sub.id,
+        idEvent=sub.event_id,
+        strSport="Soccer",
+        idLeague=sub.league_id,
+        strLeague=sub.league,
+        idHomeTeam=sub.home_team_id,
+        idAwayTeam=sub.away_team_id,
+        strHomeTeam=sub.home_team,
+        strAwayTeam=sub.away_team,
+        strStatus="45",
+        startTime=sub.start_time,
+        intHomeScore=1,
+        intAwayScore=0,
+    )
+
+
+def timed(func, rounds: int = ROUNDS) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return round((time.perf_counter() - started) / rounds * 1_000_000, 2)
+
+
+def linear_scores(subs: Subscriptions, feed: list[LivescoreEvent]):
+    ids = [x.id for x in sorted(subs.values(), key=lambda x: x.start_time)]
+    for event in filter(lambda x: x.id in ids, feed):
+        next(
+            filter(
+                lambda x: x.id == event.id,
+                sorted(subs.values(), key=lambda x: x.start_time),
+            ),
+            None,
+        )
+
+
+def indexed_scores(subs: Subscriptions, feed: list[LivescoreEvent]):
+    for event in filter(lambda x: x.id in subs, feed):
+        subs.get(event.id)
+
+
+def run(size: int) -> dict:
+    subs = Subscriptions(f"benchmark_{size}")
+    items = [subscription(idx) for idx in range(size)]
+    shuffle(items)
+    with subs.batch():
+        for item in items:
+            subs[item.id] = item
+    feed = [livescore(x) for x in items]
+    job_id = items[-1].jobId
+    rounds = max(1, ROUNDS // size)
+    return {
+        "size": size,
+        "events_sorted_us": timed(
+            lambda: sorted(subs.values(), key=lambda x: x.start_time)
+        ),
+        "events_indexed_us": timed(lambda: subs.events),
+        "job_scan_us": timed(
+            lambda: next(
+                filter(
+                    lambda x: x.jobId == job_id,
+                    sorted(subs.values(), key=lambda x: x.start_time),
+                ),
+                None,
+            )
+        ),
+        "job_index_us": timed(lambda: subs.by_job_id(job_id)),
+        "scores_linear_us": timed(lambda: linear_scores(subs, feed), rounds),
+        "scores_indexed_us": timed(lambda: indexed_scores(subs, feed), rounds),
+    }
+
+
+if __name__ == "__main__":
+    use_fakeredis()
+    for size in SIZES:
+        print(run(size))
@@ -0,0 +1,414 @@
+from datetime import datetime, timedelta, timezone
+import json
+from pathlib import Path
+from random import Random
+from statistics import mean, quantiles
+import subprocess
+import sys
+from threading import Thread
+import time
+from typing import Callable, Optional
+
+from app.lametric import LaMetric
+from app.lametric.client import Client
+from app.lametric.display import Display
+from app.lametric.models import (
+    APPNAME,
+    CONTENT_TYPE,
+    Content,
+    ContentFrame,
+    ContentSound,
+    Notification,
+)
+from app.lametric.widgets.items.subscriptions import Subscriptions
+from app.botyo.livescores import LivescoreSnapshot
+from app.botyo.models import Game, LivescoreEvent, MatchEvent
+from app.config import LametricApp, LametricConfig, app_config
+from app.simulator import Device
+from benchmarks.fakes import StubHTTP, use_fakeredis, use_stub_http
+from benchmarks.subscriptions import livescore, subscription
+
+FEED_SIZE = 500
+SCHEDULE_SIZE = 380
+SUBSCRIPTIONS = 200
+TICKS = 2000
+WARMUP_TIMEOUT = 10
+PROBES = 20
+RESULTS = Path(__file__).parent / "results"
+SEED = 20240811
+
+STATUSES = (
+    [f"{m}" for m in range(1, 91)] * 2
+    + ["HT"] * 20
+    + ["FT", "Ended", "Just Ended"] * 45
+    + ["NS", "Sched."] * 65
+    + ["Post.", "Canc.", "After Pen", "After ET", "Susp", "Aband."] * 4
+)
+ACTIONS = (
+    ["Goal"] * 6
+    + ["Yellow Card"] * 5
+    + ["Substitution"] * 5
+    + ["Red Card", "Full Time", "Game Start", "Half Time", "Goal Disallowed"]
+    + ["Woodwork", "Penalty Miss", "Progress"]
+)
+
+CASES: dict[str, Callable[[], dict]] = {}
+
+
+def case(func: Callable[[], dict]) -> Callable[[], dict]:
+    CASES[func.__name__] = func
+    return func
+
+
+def timed(func: Callable, rounds: int, per: int = 1) -> dict:
+    func()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) / per * 1_000_000)
+    pct = quantiles(timings, n=100)
+    return {
+        "rounds": rounds,
+        "mean_us": round(mean(timings), 3),
+        "p50_us": round(pct[49], 3),
+        "p95_us": round(pct[94], 3),
+    }
+
+
+def livescore_feed(size: int, rnd: Random) -> list[dict]:
+    now = datetime.now(tz=timezone.utc)
+    rows = []
+    for idx in range(size):
+        status = rnd.choice(STATUSES)
+        if status in ("NS", "Sched."):
+            start = now + timedelta(minutes=rnd.randint(10, 60 * 72))
+        elif status.isdigit():
+            start = now - timedelta(minutes=int(status) + 15)
+        else:
+            start = now - timedelta(minutes=rnd.randint(110, 60 * 48))
+        started = status not in ("NS", "Sched.", "Post.", "Canc.")
+        rows.append(
+            dict(
+                id=f"{idx:032x}",
+                idEvent=4000000 + idx,
+                strSport="Soccer",
+                idLeague=rnd.choice((8, 7, 11, 17, 25)),
+                strLeague="LaLiga",
+                idHomeTeam=idx,
+                idAwayTeam=idx + 10000,
+                strHomeTeam=f"Home {idx}",
+                strAwayTeam=f"Away {idx}",
+                strStatus=status,
+                startTime=start.isoformat(),
+                intHomeScore=rnd.randint(0, 4) if started else -1,
+                intAwayScore=rnd.randint(0, 4) if started else -1,
+            )
+        )
+    return rows
+
+
+def match_events(size: int, rnd: Random) -> list[MatchEvent]:
+    res = []
+    for idx in range(size):
+        minute = rnd.randint(1, 98)
+        res.append(
+            MatchEvent(
+                id=f"{idx % 20:032x}",
+                time=minute,
+                action=rnd.choice(ACTIONS),
+                order=idx,
+                home_team_id=131,
+                away_team_id=132,
+                is_old_event=False,
+                event_id=4000000 + idx % 20,
+                team=rnd.choice(("Real Madrid", "Barcelona")),
+                player=f"Player {idx % 30}",
+                score=f"{rnd.randint(0, 4)}:{rnd.randint(0, 4)}",
+                team_id=rnd.choice((131, 132)),
+                event_name="Real Madrid/Barcelona",
+                extraPlayers=[f"Player {idx % 7}"] if idx % 9 == 0 else None,
+                status=rnd.choice(("1st", "2nd", "HT", "Final", "ET", None)),
+            )
+        )
+    return res
+
+
+def league_schedule(size: int, rnd: Random) -> list[Game]:
+    now = datetime.now(tz=timezone.utc)
+    res = []
+    matchday = size // 20
+    for idx in range(size):
+        days = (idx // 10 - matchday) * 7
+        minutes = rnd.choice((-50, -30, -10, 90)) if days == 0 else 0
+        start = now + timedelta(days=days, minutes=minutes)
+        if start > now:
+            status = "NS"
+        elif days == 0:
+            status = "HT" if minutes == -50 else f"{-minutes}'"
+        else:
+            status = rnd.choice(("Ended", "Ended", "Ended", "After Pen", "PPD", "CNL"))
+        res.append(
+            Game(
+                id=3000000 + idx,
+                sportId=1,
+                competitionId=11,
+                competitionDisplayName="LaLiga",
+                startTime=start,
+                statusGroup=2,
+                statusText=status,
+                shortStatusText=status,
+                gameTimeAndStatusDisplayType=1,
+                homeCompetitor=dict(id=idx % 20, name=f"Home {idx % 20}"),
+                awayCompetitor=dict(id=20 + idx % 20, name=f"Away {idx % 20}"),
+            )
+        )
+    return res
+
+
+@case
+def livescore_event():
+    feed = livescore_feed(FEED_SIZE, Random(SEED))
+    return {
+        "rows": FEED_SIZE,
+        "feed": timed(lambda: [LivescoreEvent(**row) for row in feed], 20),
+        "row": timed(lambda: [LivescoreEvent(**row) for row in feed], 20, FEED_SIZE),
+    }
+
+
+@case
+def match_event():
+    events = match_events(FEED_SIZE, Random(SEED))
+    rounds = 20
+
+    def each(method: Callable):
+        return timed(lambda: [method(x) for x in events], rounds, len(events))
+
+    return {
+        "events": len(events),
+        "getContentFrame": each(lambda x: x.getContentFrame("a1234")),
+        "getTeamSound": each(lambda x: x.getTeamSound(131, is_winner=True)),
+        "getAlertContent": each(lambda x: x.getAlertContent(131, is_winner=False)),
+    }
+
+
+@case
+def game_in_progress():
+    games = league_schedule(SCHEDULE_SIZE, Random(SEED))
+    return {
+        "games": len(games),
+        "in_progress": sum(x.in_progress for x in games),
+        "schedule": timed(lambda: [x for x in games if x.in_progress], 50),
+    }
+
+
+@case
+def subscriptions():
+    use_fakeredis()
+    items = [subscription(idx) for idx in range(SUBSCRIPTIONS)]
+    feed = [livescore(x).model_dump(mode="json") for x in items]
+    use_stub_http({"livescore": feed})
+    snapshot = LivescoreSnapshot()
+    snapshot.refresh()
+    rounds = 50
+    counter = iter(range(1_000_000))
+
+    def fill():
+        subs = Subscriptions(f"benchmark_suite_{next(counter)}")
+        with subs.batch():
+            for item in items:
+                subs[item.id] = item
+        return subs
+
+    subs = fill()
+    ids = [x.id for x in items]
+
+    def reload_scores():
+        snapshot.current_version += 1
+        return subs.scores
+
+    return {
+        "size": SUBSCRIPTIONS,
+        "set": timed(fill, rounds, SUBSCRIPTIONS),
+        "get": timed(lambda: [subs.get(k) for k in ids], rounds, SUBSCRIPTIONS),
+        "events": timed(lambda: subs.events, rounds * 20),
+        "scores": timed(lambda: subs.scores, rounds * 20),
+        "scores_reload": timed(reload_scores, rounds),
+    }
+
+
+@case
+def send_model():
+    stub = use_stub_http({})
+    app = LametricApp(
+        package="com.lametric.bench",
+        widget_id="bench",
+        endpoint="http://lametric.bench/api/v1/dev/widget/update/com.lametric.bench",
+        token="token",
+    )
+    client = Client(
+        LametricConfig(
+            host="http://lametric.bench:8080",
+            user="dev",
+            apikey="key",
+            apps={APPNAME.LIVESCORES.value: app},
+            timezone="UTC",
+        )
+    )
+    model = Content(
+        frames=[
+            ContentFrame(text=f"{m}' Home {m} 1:0 Away {m}", icon=8627, index=m)
+            for m in range(12)
+        ],
+        sound=ContentSound(id="positive1"),
+    )
+    rounds = 500
+    res = {
+        "frames": len(model.frames),
+        "model_data": timed(lambda: client.model_data(model), rounds),
+        "send_model": timed(
+            lambda: client.send_model(APPNAME.LIVESCORES, model), rounds
+        ),
+    }
+    res["requests"] = sum(stub.calls.values())
+    return res
+
+
+def device_routes() -> dict:
+    device = Device(app_config.lametric)
+    return {"device/apps": device.apps, "device/display": device.display}
+
+
+@case
+def display_update():
+    use_fakeredis()
+    stub = use_stub_http(device_routes())
+    display = Display(client=Client(app_config.lametric))
+    display.update()
+    deadline = time.monotonic() + WARMUP_TIMEOUT
+    while time.monotonic() < deadline and not all(
+        x.ready for x in display._widgets.values()
+    ):
+        time.sleep(0.05)
+
+    def rotate():
+        if display._current:
+            display._current.deactivate()
+        display.update()
+
+    return {
+        "items": len(display._items),
+        "steady": timed(display.update, TICKS),
+        "rotate": timed(rotate, TICKS // 10),
+        "shown": dict(display._items.shown),
+        "requests": sum(stub.calls.values()),
+    }
+
+
+def pushed_at(stub: StubHTTP, suffix: str, after: float) -> Optional[float]:
+    deadline = time.monotonic() + WARMUP_TIMEOUT
+    while time.monotonic() < deadline:
+        for path, at in reversed(stub.sent):
+            if at < after:
+                break
+            if path.endswith(suffix):
+                return at
+        time.sleep(0.001)
+    return None
+
+
+def latency(values: list[Optional[float]]) -> dict:
+    ms = [x * 1000 for x in values if x is not None]
+    return {
+        "probes": len(values),
+        "timeouts": len(values) - len(ms),
+        "mean_ms": round(mean(ms), 3) if ms else None,
+        "max_ms": round(max(ms), 3) if ms else None,
+    }
+
+
+@case
+def push_latency():
+    use_fakeredis()
+    stub = use_stub_http(device_routes())
+    app_config.lametric.notification_rate = 1000
+    client = LaMetric()._client
+    Thread(target=LaMetric.start, args=(None,), daemon=True).start()
+    window = app_config.lametric.frame_window
+    writer = client.writer(APPNAME.LIVESCORES)
+    ingest, notify, held = [], [], []
+    for idx in range(PROBES):
+        time.sleep(window * 2)
+        started = time.monotonic()
+        LaMetric.queue.put_nowait(
+            (CONTENT_TYPE.LIVESCOREEVENT, subscription(idx).model_dump(mode="json"))
+        )
+        at = pushed_at(stub, "/push", started)
+        ingest.append(at and at - started)
+        started = time.monotonic()
+        client.notify(Notification(model=Content(frames=[ContentFrame(text=f"{idx}")])))
+        at = pushed_at(stub, "device/notifications", started)
+        notify.append(at and at - started)
+        time.sleep(window * 2)
+        writer.write(Content(frames=[ContentFrame(text=f"lead {idx}")]))
+        started = time.monotonic()
+        writer.write(Content(frames=[ContentFrame(text=f"held {idx}")]))
+        due_at = writer.due_at
+        at = pushed_at(stub, "/push", started)
+        held.append(at and due_at and max(0, at - due_at))
+    return {
+        "ingest_to_push": latency(ingest),
+        "notify_to_push": latency(notify),
+        "held_frame_overshoot": latency(held),
+    }
+
+
+def commit() -> str:
+    proc = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+    )
+    return proc.stdout.strip()
+
+
+def run(names: list[str]) -> dict:
+    results = {}
+    for name in names:
+        started = time.perf_counter()
+        try:
+            results[name] = CASES[name]()
+        except Exception as e:
+            results[name] = {"error": f"{e.__class__.__name__}: {e}"}
+        results[name]["elapsed_s"] = round(time.perf_counter() - started, 3)
+        print(name, results[name])
+    return {
+        "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+        "commit": commit(),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict, prefix: str = "") -> list[str]:
+    res = []
+    for k, v in new.items():
+        name = f"{prefix}{k}"
+        if isinstance(v, dict) and isinstance(old.get(k), dict):
+            res += compare(old[k], v, f"{name}.")
+        elif k in ("mean_us", "p50_us", "p95_us") and old.get(k):
+            res.append(f"{name:<50} {old[k]:>12.3f} {v:>12.3f} {v / old[k] - 1:>+8.1%}")
+    return res
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["compare"]:
+        old, new = [json.loads(Path(x).read_text())["results"] for x in args[1:3]]
+        print("\n".join(compare(old, new)))
+        sys.exit(0)
+    names = args or list(CASES)
+    assert all(x in CASES for x in names), f"cases: {', '.join(CASES)}"
+    report = run(names)
+    RESULTS.mkdir(exist_ok=True)
+    out = RESULTS / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.write_text(json.dumps(report, indent=2))
+    print(out)
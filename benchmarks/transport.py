@@ -0,0 +1,63 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from statistics import mean, quantiles
+from threading import Thread
+import time
+
+import requests
+from cachable.request import Method
+
+from app.config import LametricConfig
+from app.lametric.client import Client
+
+REQUESTS = 200
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"success": {}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def measure(call) -> dict:
+    timings = []
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    pct = quantiles(timings, n=100)
+    return {
+        "mean_ms": round(mean(timings), 3),
+        "p50_ms": round(pct[49], 3),
+        "p99_ms": round(pct[98], 3),
+    }
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_port}"
+    url = f"{host}/api/v2/device/notifications"
+    payload = {"model": {"frames": [{"text": "GOAL", "icon": 8627}]}}
+    client = Client(
+        LametricConfig(host=host, user="dev", apikey="key", apps={}, timezone="UTC")
+    )
+    print(
+        "unpooled",
+        measure(lambda: requests.post(url, auth=("dev", "key"), json=payload)),
+    )
+    print(
+        "pooled",
+        measure(lambda: client.request(Method.POST, url=url, json=payload)),
+    )
+    server.shutdown()
@@ -0,0 +1,17 @@
+from os import environ
+from pathlib import Path
+
+environ.setdefault("SETTINGS_PATH", f"{Path(__file__).parent / 'settings.yaml'}")
+
+import app.lametric  # noqa: E402,F401 - resolves the app.botyo.models cycle
+import fakeredis  # noqa: E402
+import pytest  # noqa: E402
+from cachable.storage.redis import RedisStorage  # noqa: E402
+
+
+@pytest.fixture
+def redis(monkeypatch) -> fakeredis.FakeRedis:
+    server = fakeredis.FakeRedis()
+    for name in ("hgetall", "pipeline"):
+        monkeypatch.setattr(RedisStorage, name, getattr(server, name))
+    return server
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+import pickle
+from uuid import uuid4
+
+import pytest
+
+from app.botyo.models import SubscriptionEvent
+from app.lametric.widgets.items.codec import (
+    CODEC_VERSION,
+    CodecError,
+    UnknownVersion,
+    decode,
+    encode,
+    is_legacy,
+)
+from app.lametric.widgets.items.subscriptions import Subscriptions
+
+
+def subscription(idx: int = 1, **kwds) -> SubscriptionEvent:
+    data = dict(
+        id=f"{idx:032x}",
+        action="Subscribed",
+        league="LaLiga",
+        league_id=8,
+        home_team="Real Madrid",
+        home_team_id=131,
+        away_team="Barcelona",
+        away_team_id=132,
+        event_id=4000000 + idx,
+        event_name="Real Madrid/Barcelona",
+        job_id=f"{idx:032x}:livescore",
+        icon="https://example.com/laliga.png",
+        start_time=datetime(2024, 8, 11, 19, tzinfo=timezone.utc),
+    )
+    data.update(kwds)
+    return SubscriptionEvent(**data)
+
+
+def test_round_trip():
+    sub = subscription(status="FT", score="2:1", display_event_name="RM / FCB")
+    raw = encode(sub)
+    assert raw[0] == CODEC_VERSION
+    assert decode(raw) == sub
+
+
+def test_round_trip_keeps_explicit_none():
+    sub = subscription(score=None, home_team_icon="https://example.com/131.png")
+    assert decode(encode(sub)) == sub
+
+
+def test_encoding_is_smaller_than_pickle():
+    sub = subscription()
+    assert len(encode(sub)) < len(pickle.dumps(sub))
+
+
+def test_legacy_pickle_still_decodes():
+    sub = subscription()
+    raw = pickle.dumps(sub)
+    assert is_legacy(raw)
+    assert decode(raw) == sub
+
+
+def test_unknown_version_raises():
+    with pytest.raises(UnknownVersion):
+        decode(bytes([99]) + b"[]")
+
+
+@pytest.mark.parametrize("raw", [b"", bytes([CODEC_VERSION]) + b"{", b"\x80garbage"])
+def test_corrupt_records_raise_codec_error(raw):
+    with pytest.raises(CodecError):
+        decode(raw)
+
+
+def test_load_migrates_legacy_and_keeps_undecodable_records(redis):
+    key = f"test_codec_{uuid4().hex}"
+    legacy, current = subscription(1), subscription(2)
+    redis.hset(key, legacy.id, pickle.dumps(legacy))
+    redis.hset(key, current.id, encode(current))
+    redis.hset(key, "unknown", bytes([99]) + b"[]")
+    redis.hset(key, "corrupt", b"\x80garbage")
+    subs = Subscriptions(key)
+    assert set(subs) == {legacy.id, current.id}
+    assert redis.hget(key, legacy.id)[0] == CODEC_VERSION
+    assert redis.hget(key, "unknown") == bytes([99]) + b"[]"
+    assert redis.hget(key, "corrupt") == b"\x80garbage"
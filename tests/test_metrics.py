@@ -0,0 +1,79 @@
+from uuid import uuid4
+
+import pytest
+
+from app.config import app_config
+from app.core.metrics import Counter, Histogram, Metrics, format_labels
+from app.lametric.client import Client
+from app.lametric.models import APPNAME
+
+
+def name(prefix: str) -> str:
+    return f"{prefix}_{uuid4().hex[:8]}"
+
+
+def lines(family: str) -> list[str]:
+    return [x for x in Metrics.exposition().splitlines() if family in x]
+
+
+def test_counter_and_gauge_render_with_type_lines():
+    counter, gauge = name("test_total"), name("test_depth")
+    Metrics.counter(counter, endpoint="a").inc(2)
+    Metrics.gauge(gauge, fn=lambda: 7)
+    assert lines(counter) == [
+        f"# TYPE {counter} counter",
+        f'{counter}{{endpoint="a"}} 2',
+    ]
+    assert lines(gauge) == [f"# TYPE {gauge} gauge", f"{gauge} 7"]
+
+
+def test_same_name_and_labels_share_a_metric():
+    family = name("test_total")
+    assert Metrics.counter(family, a="1") is Metrics.counter(family, a="1")
+    assert Metrics.counter(family, a="1") is not Metrics.counter(family, a="2")
+    assert isinstance(Metrics.counter(family), Counter)
+
+
+def test_histogram_buckets_are_cumulative():
+    family = name("test_seconds")
+    histogram = Metrics.histogram(family)
+    assert isinstance(histogram, Histogram)
+    for value in (0.003, 0.02, 0.02, 20):
+        histogram.observe(value)
+    rendered = lines(family)
+    assert rendered[0] == f"# TYPE {family} histogram"
+    assert f'{family}_bucket{{le="0.005"}} 1' in rendered
+    assert f'{family}_bucket{{le="0.025"}} 3' in rendered
+    assert f'{family}_bucket{{le="10"}} 3' in rendered
+    assert f'{family}_bucket{{le="+Inf"}} 4' in rendered
+    assert f"{family}_count 4" in rendered
+
+
+def test_track_counts_errors():
+    family = name("test_request")
+    with pytest.raises(ValueError):
+        with Metrics.track(family, endpoint="x"):
+            raise ValueError
+    assert Metrics.counter(f"{family}_errors_total", endpoint="x").value == 1
+    assert Metrics.histogram(f"{family}_seconds", endpoint="x").count == 1
+
+
+def test_label_values_are_escaped():
+    assert format_labels({"path": 'a"b\\c\nd'}) == '{path="a\\"b\\\\c\\nd"}'
+
+
+def test_collectors_are_replaced_by_name():
+    collector, family = name("test"), name("test_collected")
+    Metrics.collector(collector, lambda: [(family, "gauge", {}, 1)])
+    Metrics.collector(collector, lambda: [(family, "gauge", {}, 2)])
+    assert lines(family) == [f"# TYPE {family} gauge", f"{family} 2"]
+
+
+def test_client_exports_writer_and_notification_stats():
+    client = Client(app_config.lametric)
+    client.writer(APPNAME.CLOCK)
+    writes = lines("lametric_frame_writes_total")
+    assert 'lametric_frame_writes_total{app="clock",outcome="requested"} 0' in writes
+    assert "lametric_notifications_pending 0" in lines("lametric_notifications")
+    Client(app_config.lametric)
+    assert not lines("lametric_frame_writes_total")
@@ -0,0 +1,125 @@
+from time import sleep
+
+import pytest
+
+from app.botyo.models import MatchEvent
+from app.lametric.models import (
+    NOTIFICATION_PRIORITY,
+    Content,
+    ContentFrame,
+    Notification,
+)
+from app.lametric.notifications import NotificationScheduler, TokenBucket
+
+
+def notification(text: str) -> Notification:
+    return Notification(model=Content(frames=[ContentFrame(text=text)]))
+
+
+def make_scheduler(rate: float = 1000, burst: int = 10):
+    sent: list[str] = []
+    scheduler = NotificationScheduler(
+        send=lambda x: sent.append(x.model.frames[0].text), rate=rate, burst=burst
+    )
+    return scheduler, sent
+
+
+def match_event(action: str) -> MatchEvent:
+    return MatchEvent(
+        id="a" * 32,
+        time=10,
+        action=action,
+        order=1,
+        home_team_id=1,
+        away_team_id=2,
+        is_old_event=False,
+        event_id=1,
+        team="Home",
+        player="Player",
+        score="1:0",
+        team_id=1,
+        event_name="Home/Away",
+    )
+
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.take()
+    assert bucket.take()
+    assert not bucket.take()
+    assert 0 < bucket.next_token_in <= 0.1
+    sleep(0.11)
+    assert bucket.take()
+
+
+def test_sends_by_priority_then_arrival():
+    scheduler, sent = make_scheduler()
+    scheduler.push(notification("info"), priority=NOTIFICATION_PRIORITY.INFO)
+    scheduler.push(notification("warning"), priority=NOTIFICATION_PRIORITY.WARNING)
+    for idx in (1, 2):
+        scheduler.push(
+            notification(f"critical {idx}"), priority=NOTIFICATION_PRIORITY.CRITICAL
+        )
+    scheduler.flush()
+    assert sent == ["critical 1", "critical 2", "warning", "info"]
+
+
+def test_priority_defaults_to_the_device_priority():
+    scheduler, sent = make_scheduler()
+    scheduler.push(notification("info"))
+    critical = notification("critical")
+    critical.priority = "critical"
+    scheduler.push(critical)
+    scheduler.flush()
+    assert sent == ["critical", "info"]
+
+
+def test_same_key_supersedes_pending_notification():
+    scheduler, sent = make_scheduler()
+    scheduler.push(notification("1:0"), key="match:score")
+    scheduler.push(notification("other"))
+    scheduler.push(notification("1:1"), key="match:score")
+    scheduler.flush()
+    assert sent == ["other", "1:1"]
+    assert scheduler.stats["superseded"] == 1
+
+
+def test_rate_limit_holds_notifications():
+    scheduler, sent = make_scheduler(rate=1, burst=1)
+    scheduler.push(notification("a"))
+    scheduler.push(notification("b"))
+    scheduler.flush()
+    assert sent == ["a"]
+    assert scheduler.stats["pending"] == 1
+    assert scheduler.next_flush_in > 0
+
+
+def test_push_signals_pending():
+    calls = []
+    scheduler = NotificationScheduler(
+        send=lambda x: None, rate=1, burst=1, on_pending=lambda: calls.append(1)
+    )
+    scheduler.push(notification("a"))
+    assert calls == [1]
+
+
+@pytest.mark.parametrize(
+    "action,priority",
+    [
+        ("Goal", NOTIFICATION_PRIORITY.CRITICAL),
+        ("Goal Disallowed", NOTIFICATION_PRIORITY.CRITICAL),
+        ("Full Time", NOTIFICATION_PRIORITY.CRITICAL),
+        ("Yellow Card", NOTIFICATION_PRIORITY.WARNING),
+        ("Red Card", NOTIFICATION_PRIORITY.WARNING),
+        ("Substitution", NOTIFICATION_PRIORITY.WARNING),
+        ("Woodwork", NOTIFICATION_PRIORITY.INFO),
+        ("Unknown", NOTIFICATION_PRIORITY.INFO),
+    ],
+)
+def test_match_event_priority(action, priority):
+    assert match_event(action).priority == priority
+
+
+def test_goal_events_share_a_notification_key():
+    assert match_event("Goal").notification_key == f"{'a' * 32}:score"
+    assert match_event("Yellow Card").notification_key is None
@@ -0,0 +1,100 @@
+from queue import Empty, Full
+
+import pytest
+
+from app.config import IngressQueueConfig
+from app.lametric.queue import EventQueue
+
+
+def make_queue(**kwds) -> EventQueue:
+    return EventQueue(IngressQueueConfig(**kwds))
+
+
+def payloads(queue: EventQueue) -> list:
+    return [x.payload for x in queue.get_entries(timeout=0)]
+
+
+def test_drop_newest_rejects_when_full():
+    queue = make_queue(bounds={"sure": 2}, overflow={"sure": "drop_newest"})
+    queue.put_nowait(("sure", 1))
+    queue.put_nowait(("sure", 2))
+    with pytest.raises(Full):
+        queue.put_nowait(("sure", 3))
+    assert payloads(queue) == [1, 2]
+    assert queue.stats["sure"]["rejected"] == 1
+
+
+def test_drop_oldest_evicts_head():
+    queue = make_queue(bounds={"sure": 2}, overflow={"sure": "drop_oldest"})
+    for idx in range(3):
+        queue.put_nowait(("sure", idx))
+    assert payloads(queue) == [1, 2]
+    assert queue.stats["sure"]["dropped"] == 1
+
+
+def test_bounds_are_per_type():
+    queue = make_queue(bounds={"sure": 1}, overflow={"sure": "drop_newest"})
+    queue.put_nowait(("sure", 1))
+    queue.put_nowait(("termo", {"location": "a"}))
+    assert queue.qsize() == 2
+
+
+def test_collapse_replaces_entry_with_same_key():
+    queue = make_queue(bounds={"termo": 2})
+    queue.put_nowait(("termo", {"location": "a", "v": 0}))
+    queue.put_nowait(("termo", {"location": "b", "v": 0}))
+    queue.put_nowait(("termo", {"location": "a", "v": 1}))
+    assert payloads(queue) == [{"location": "a", "v": 1}, {"location": "b", "v": 0}]
+    assert queue.stats["termo"]["collapsed"] == 1
+
+
+def test_collapse_miss_keeps_recently_collapsed_entry():
+    queue = make_queue(bounds={"termo": 3})
+    for location in "abc":
+        queue.put_nowait(("termo", {"location": location, "v": 0}))
+    queue.put_nowait(("termo", {"location": "a", "v": 1}))
+    queue.put_nowait(("termo", {"location": "d", "v": 0}))
+    assert payloads(queue) == [
+        {"location": "a", "v": 1},
+        {"location": "c", "v": 0},
+        {"location": "d", "v": 0},
+    ]
+    assert queue.stats["termo"]["dropped"] == 1
+
+
+def test_keyless_payloads_never_collapse():
+    queue = make_queue(bounds={"nowplaying": 2})
+    for idx in range(3):
+        queue.put_nowait(("nowplaying", {"idx": idx}))
+    assert payloads(queue) == [{"idx": 1}, {"idx": 2}]
+    assert queue.stats["nowplaying"]["collapsed"] == 0
+
+
+def test_collapse_fallback_drop_newest():
+    queue = make_queue(bounds={"nowplaying": 1}, collapse_fallback="drop_newest")
+    queue.put_nowait(("nowplaying", {"idx": 0}))
+    with pytest.raises(Full):
+        queue.put_nowait(("nowplaying", {"idx": 1}))
+    assert payloads(queue) == [{"idx": 0}]
+
+
+def test_put_many_is_all_or_nothing_for_drop_newest():
+    queue = make_queue(bounds={"sure": 2}, overflow={"sure": "drop_newest"})
+    queue.put_nowait(("sure", 0))
+    with pytest.raises(Full):
+        queue.put_many([("sure", 1), ("sure", 2)])
+    assert payloads(queue) == [0]
+
+
+def test_entries_come_out_in_arrival_order_across_types():
+    queue = make_queue()
+    queue.put_many([("sure", 1), ("termo", {"location": "a"}), ("sure", 2)])
+    assert payloads(queue) == [1, {"location": "a"}, 2]
+
+
+def test_wake_returns_without_entries():
+    queue = make_queue()
+    queue.wake()
+    assert queue.get_entries(timeout=0) == []
+    with pytest.raises(Empty):
+        queue.get_entries(timeout=0)
@@ -0,0 +1,76 @@
+from typing import Any, Optional
+
+from app.lametric.routing import LivescoreRouter
+from app.lametric.widgets.base import ROUTE
+
+
+class Widget(object):
+
+    def __init__(self, route: Optional[tuple[ROUTE, int]]) -> None:
+        self.route = route
+        self.received: list[Any] = []
+
+    def on_routed(self, payload):
+        self.received.append(payload)
+
+
+def make_router():
+    team = Widget((ROUTE.TEAM, 131))
+    league = Widget((ROUTE.LEAGUE, 8))
+    default = Widget(None)
+    router = LivescoreRouter()
+    for widget in (team, league, default):
+        router.register(widget)
+    return router, team, league, default
+
+
+def record(home: int = 1, away: int = 2, league: int = 99) -> dict:
+    return dict(home_team_id=home, away_team_id=away, league_id=league)
+
+
+def test_team_route_wins_over_league():
+    router, team, league, _ = make_router()
+    assert router.resolve(record(home=131, league=8)) is team
+    assert router.resolve(record(away=131, league=8)) is team
+    assert router.resolve(record(league=8)) is league
+
+
+def test_unmatched_records_go_to_default():
+    router, _, _, default = make_router()
+    assert router.resolve(record()) is default
+    assert router.resolve({}) is default
+
+
+def test_without_default_unmatched_records_are_dropped():
+    router = LivescoreRouter()
+    router.register(Widget((ROUTE.LEAGUE, 8)))
+    assert router.resolve(record()) is None
+    router.route([record()])
+
+
+def test_batch_is_split_once_per_widget():
+    router, team, league, default = make_router()
+    payload = [
+        record(home=131),
+        record(league=8),
+        record(),
+        record(away=131, league=8),
+    ]
+    router.route(payload)
+    assert team.received == [[payload[0], payload[3]]]
+    assert league.received == [[payload[1]]]
+    assert default.received == [[payload[2]]]
+
+
+def test_single_record_is_routed_as_is():
+    router, team, _, default = make_router()
+    router.route(record(home=131))
+    assert team.received == [record(home=131)]
+    assert default.received == []
+
+
+def test_empty_payload_is_ignored():
+    router, team, league, default = make_router()
+    router.route([])
+    router.route(None)
+    assert not (team.received or league.received or default.received)
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.botyo.models import SubscriptionEvent
+from app.lametric.widgets.items.subscriptions import Subscriptions
+
+STARTED = datetime(2024, 8, 11, 19, tzinfo=timezone.utc)
+
+
+def subscription(idx: int, hours: int = 0) -> SubscriptionEvent:
+    return SubscriptionEvent(
+        id=f"{idx:032x}",
+        action="Subscribed",
+        league="LaLiga",
+        league_id=8,
+        home_team=f"Home {idx}",
+        home_team_id=idx,
+        away_team=f"Away {idx}",
+        away_team_id=idx + 1000,
+        event_id=4000000 + idx,
+        event_name=f"Home {idx}/Away {idx}",
+        job_id=f"{idx:032x}:livescore",
+        icon="",
+        start_time=STARTED + timedelta(hours=hours),
+    )
+
+
+@pytest.fixture
+def subs(redis) -> Subscriptions:
+    return Subscriptions(f"test_subscriptions_{uuid4().hex}")
+
+
+def test_events_are_ordered_by_start_time(subs):
+    with subs.batch():
+        for idx, hours in enumerate((3, 1, 2)):
+            subs[f"{idx:032x}"] = subscription(idx, hours)
+    assert [x.start_time.hour for x in subs.events] == [20, 21, 22]
+
+
+def test_events_follow_updates_and_deletes(subs):
+    with subs.batch():
+        subs[f"{1:032x}"] = subscription(1, 1)
+        subs[f"{2:032x}"] = subscription(2, 2)
+    assert [x.id for x in subs.events] == [f"{1:032x}", f"{2:032x}"]
+    subs[f"{1:032x}"] = subscription(1, 3)
+    assert [x.id for x in subs.events] == [f"{2:032x}", f"{1:032x}"]
+    del subs[f"{2:032x}"]
+    assert [x.id for x in subs.events] == [f"{1:032x}"]
+
+
+def test_lookup_by_job_and_event_id(subs):
+    sub = subscription(5)
+    subs[sub.id] = sub
+    assert subs.by_job_id(sub.jobId) == sub
+    assert subs.by_event_id(sub.event_id) == sub
+    assert subs.by_event_id(f"{sub.event_id}") == sub
+    del subs[sub.id]
+    assert subs.by_job_id(sub.jobId) is None
+    assert subs.by_event_id(sub.event_id) is None
+
+
+def test_batch_writes_in_one_flush(redis):
+    key = f"test_subscriptions_{uuid4().hex}"
+    subs = Subscriptions(key)
+    with subs.batch():
+        for idx in range(3):
+            sub = subscription(idx)
+            subs[sub.id] = sub
+        assert redis.hlen(key) == 0
+    assert redis.hlen(key) == 3
+
+
+def test_indexes_are_rebuilt_on_load(redis):
+    key = f"test_subscriptions_{uuid4().hex}"
+    subs = Subscriptions(key)
+    with subs.batch():
+        for idx, hours in enumerate((2, 1)):
+            sub = subscription(idx, hours)
+            subs[sub.id] = sub
+    del Subscriptions.instances[key]
+    loaded = Subscriptions(key)
+    assert [x.id for x in loaded.events] == [f"{1:032x}", f"{0:032x}"]
+    assert loaded.by_job_id(subscription(0).jobId).id == f"{0:032x}"
@@ -0,0 +1,130 @@
+from threading import Event, Thread
+from time import monotonic, sleep
+
+from app.lametric.models import APPNAME, Content, ContentFrame
+from app.lametric.writer import FrameWriter
+
+WINDOW = 0.05
+
+
+def content(text: str) -> Content:
+    return Content(frames=[ContentFrame(text=text)])
+
+
+class Device(object):
+
+    def __init__(self, status: int = 200) -> None:
+        self.status = status
+        self.pushed: list[str] = []
+
+    def send(self, data: dict) -> int:
+        self.pushed.append(data["frames"][0]["text"])
+        return self.status
+
+
+def make_writer(device: Device, **kwds) -> FrameWriter:
+    return FrameWriter(
+        appname=APPNAME.CLOCK,
+        serialize=lambda model: model.model_dump(),
+        send=device.send,
+        window=WINDOW,
+        **kwds,
+    )
+
+
+def test_first_write_is_sent_immediately():
+    device = Device()
+    writer = make_writer(device)
+    writer.write(content("a"))
+    assert device.pushed == ["a"]
+    assert writer.due_at is None
+
+
+def test_writes_within_window_are_coalesced():
+    device = Device()
+    writer = make_writer(device)
+    writer.write(content("a"))
+    writer.write(content("b"))
+    writer.write(content("c"))
+    assert device.pushed == ["a"]
+    writer.flush()
+    assert device.pushed == ["a"]
+    sleep(WINDOW)
+    writer.flush()
+    assert device.pushed == ["a", "c"]
+    assert writer.stats["coalesced"] == 1
+
+
+def test_identical_payload_is_suppressed():
+    device = Device()
+    writer = make_writer(device)
+    writer.write(content("a"))
+    writer.write(content("a"))
+    writer.flush(force=True)
+    assert device.pushed == ["a"]
+    assert writer.stats["suppressed"] == 1
+
+
+def test_failed_push_keeps_the_frame():
+    device = Device(status=500)
+    writer = make_writer(device)
+    writer.write(content("a"))
+    assert writer.stats["failed"] == 1
+    assert writer.due_at is not None
+    device.status = 200
+    writer.flush(force=True)
+    assert device.pushed == ["a", "a"]
+    assert writer.stats["sent"] == 1
+
+
+def test_failed_push_does_not_replace_a_newer_frame():
+    device = Device(status=500)
+    writer = make_writer(device)
+    writer.write(content("a"))
+    writer.write(content("b"))
+    device.status = 200
+    writer.flush(force=True)
+    assert device.pushed == ["a", "b"]
+
+
+def test_send_error_counts_as_failure():
+    def send(data: dict) -> int:
+        raise ConnectionError("down")
+
+    writer = FrameWriter(APPNAME.CLOCK, lambda m: m.model_dump(), send, WINDOW)
+    writer.write(content("a"))
+    assert writer.stats["failed"] == 1
+    assert writer.due_at is not None
+
+
+def test_write_does_not_wait_for_a_push_in_flight():
+    release = Event()
+    pushed = []
+
+    def send(data: dict) -> int:
+        pushed.append(data["frames"][0]["text"])
+        release.wait(5)
+        return 200
+
+    writer = FrameWriter(APPNAME.CLOCK, lambda m: m.model_dump(), send, WINDOW)
+    sender = Thread(target=writer.write, args=(content("a"),))
+    sender.start()
+    while not pushed:
+        sleep(0.001)
+    started = monotonic()
+    writer.write(content("b"))
+    assert monotonic() - started < 1
+    release.set()
+    sender.join()
+    writer.flush(force=True)
+    assert pushed == ["a", "b"]
+
+
+def test_held_write_signals_pending():
+    calls = []
+    writer = make_writer(Device(), on_pending=lambda: calls.append(1))
+    writer.write(content("a"))
+    assert calls == []
+    writer.write(content("b"))
+    writer.write(content("c"))
+    assert calls == [1]